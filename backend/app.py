@@ -1,17 +1,21 @@
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect, Query
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, Depends
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, Response
 import uvicorn
 import os
+import sys
 import logging
 from contextlib import asynccontextmanager
 from dotenv import load_dotenv
-from typing import Optional
-from datetime import datetime
 from models.telemetry import GenericMessage
 from models.configuration import HistoricalDataQuery, HistoricalDataResponse
 
-logging.basicConfig(level=logging.INFO)
+from services.ratelimited_log import RateLimitedLogger, configure_logging
+
+configure_logging(logging.INFO)
 logger = logging.getLogger(__name__)
+# For the /ws receive loop, where a misbehaving client can produce an error per message
+ws_logger = RateLimitedLogger(logger)
 
 
 from services.websocket_manager import websocket_manager
@@ -40,7 +44,8 @@ app = FastAPI(
     title="Telemetry App Backend",
     description="Real-time telemetry data streaming and command interface",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 # Configure CORS
@@ -65,8 +70,11 @@ async def websocket_endpoint(websocket: WebSocket):
     await websocket_manager.connect(websocket)
     try:
         while True:
-            # Receive message from client
-            data = await websocket.receive_text()
+            # Receive the raw frame so binary frames reach the JSON parser undecoded
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(message.get("code", 1000))
+            data = message.get("bytes") or message.get("text", "")
             
             # Handle incoming command messages
             try:
@@ -75,51 +83,37 @@ async def websocket_endpoint(websocket: WebSocket):
                 await simulator.handle_command(command_message)
                 
             except Exception as e:
-                print(f"Error handling message: {e}")
+                ws_logger.error("Error handling message: %s", e)
                 # Error response is already sent by websocket_manager
                 
     except WebSocketDisconnect:
         websocket_manager.disconnect(websocket)
-        print("Client disconnected")
-
-@app.get("/historical-data")
-async def get_historical_data(
-    limit: Optional[int] = Query(None, description="Maximum number of messages to return"),
-    type: Optional[str] = Query(None, description="Filter by message type"),
-    id: Optional[str] = Query(None, description="Filter by message ID"),
-    since: Optional[str] = Query(None, description="ISO timestamp - only return messages after this time"),
-    until: Optional[str] = Query(None, description="ISO timestamp - only return messages before this time")
-) -> Optional[HistoricalDataResponse]:
+        logger.info("Client disconnected")
+
+@app.get("/historical-data", response_model=HistoricalDataResponse)
+async def get_historical_data(query: HistoricalDataQuery = Depends()) -> Response:
     """
     Get historical telemetry data with optional filtering.
-    Returns a list of telemetry messages (a HistoricalDataResponse) based on the provided filters, or None if there is an error.
+    Query parameters: limit, type, id, since and until (ISO timestamps, exclusive bounds).
+    Returns a list of telemetry messages (a HistoricalDataResponse) based on the provided filters.
+    Invalid parameters are rejected with a 422 response.
     """
-    since_datetime = None
-    if since:
-        try:
-            since_datetime = datetime.fromisoformat(since.replace('Z', '+00:00'))
-        except ValueError:
-            logger.error("Invalid timestamp format for 'since'. Use ISO format.")
-            return None
-
-    until_datetime = None
-    if until:
-        try:
-            until_datetime = datetime.fromisoformat(until.replace('Z', '+00:00'))
-        except ValueError:
-            logger.error("Invalid timestamp format for 'until'. Use ISO format.")
-            return None
-
-    query = HistoricalDataQuery(
-        limit=limit,
-        type=type,
-        id=id,
-        from_timestamp=since_datetime.isoformat() if since_datetime else None,
-        to_timestamp=until_datetime.isoformat() if until_datetime else None
+    # Serve the stored message encodings directly instead of re-serializing every message
+    return Response(
+        content=websocket_manager.get_historical_data_json(query),
+        media_type="application/json"
     )
-    historical_data = websocket_manager.get_historical_data(query)
-    
-    return historical_data
+
+@app.get("/historical-data/series")
+async def get_historical_series(query: HistoricalDataQuery = Depends()):
+    """
+    Get the history of a numeric telemetry type as timestamp and value columns.
+    Query parameters: id (required), limit, since and until (ISO timestamps, exclusive bounds).
+    """
+    series_json = websocket_manager.get_series_json(query)
+    if series_json is None:
+        return {"error": f"No numeric telemetry series for id '{query.id}'"}
+    return Response(content=series_json, media_type="application/json")
 
 @app.get("/telemetry-types")
 async def get_telemetry_types():
@@ -148,11 +142,25 @@ if __name__ == "__main__":
     host = os.getenv("HOST", "localhost")
     port = int(os.getenv("PORT", 8000))
     debug = os.getenv("DEBUG", "false").lower() == "true"
+    # Each worker would be a separate process with its own simulator, configuration and history,
+    # so clients would only see the stream of the worker they happen to be connected to
+    workers = int(os.getenv("WORKERS", "1"))
+    if workers != 1:
+        sys.exit(f"WORKERS={workers} is not supported: the simulator and history are per process, run a single worker")
+
+    # uvloop and httptools (installed by uvicorn[standard]) are not available on Windows
+    loop = "asyncio" if sys.platform == "win32" else "uvloop"
+    http = "h11" if sys.platform == "win32" else "httptools"
     
     uvicorn.run(
         "app:app",
         host=host,
         port=port,
         reload=debug,
+        workers=workers,
+        loop=loop,
+        http=http,
+        # Deflate would compress every broadcast once per client and keep a zlib window per connection
+        ws_per_message_deflate=False,
         log_level="info" if not debug else "debug"
     )
@@ -0,0 +1,23 @@
+import time
+from datetime import datetime
+
+# How long a cached timestamp is reused before the wall clock is read again
+CLOCK_RESOLUTION_NS = 1_000_000  # 1 ms
+
+_cached_datetime: datetime = datetime.now()
+_cached_at_ns: int = time.monotonic_ns()
+
+
+def current_dt() -> datetime:
+    """
+    Get the current local time, with millisecond resolution.
+    The datetime is built at most once per CLOCK_RESOLUTION_NS and shared by every
+    message created in that window, instead of calling datetime.now() per message.
+    """
+    global _cached_datetime, _cached_at_ns
+
+    now_ns = time.monotonic_ns()
+    if now_ns - _cached_at_ns >= CLOCK_RESOLUTION_NS:
+        _cached_datetime = datetime.now()
+        _cached_at_ns = now_ns
+    return _cached_datetime
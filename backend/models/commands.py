@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Dict, Any, Optional, Literal, List, Union
 from enum import Enum
 
@@ -25,7 +25,7 @@ class Command(BaseModel):
     Internal command representation after validation.
     """
     command: str
-    parameters: Optional[List[CommandParameter]] = None  # Command parameters, if any
+    parameters: Dict[str, Any] = Field(default_factory=dict)  # Parameter values keyed by name, validated against the CommandTemplate
 
 
 class CommandResult(BaseModel):
@@ -1,6 +1,7 @@
-from pydantic import BaseModel
-from typing import Optional, Dict, List, Union, Literal
+from pydantic import BaseModel, ConfigDict, Field, PositiveInt, PrivateAttr, model_validator
+from typing import Optional, Dict, List, Union, Literal, Any, FrozenSet
 from enum import Enum
+from datetime import datetime
 from .telemetry import GenericMessage
 
 
@@ -24,6 +25,21 @@ class TelemetryTypeConfig(BaseModel):
     range: Optional[Dict[str, Union[int, float]]] = None  # {"min": 0, "max": 100}
     description: str
     enum: Optional[List[Union[str, int, float]]] = None  # For types with fixed values (e.g., "on", "off"; or 1, 2, 3)
+    storage_dtype: Optional[Literal["float32", "int16"]] = None  # Reduced precision storage for numeric history, int16 needs range min/max
+
+    _enum_set: Optional[FrozenSet[Union[str, int, float]]] = PrivateAttr(default=None)  # O(1) membership for enum
+
+    def model_post_init(self, __context: Any) -> None:
+        if self.enum:
+            self._enum_set = frozenset(self.enum)
+
+    @model_validator(mode="after")
+    def _check_storage_dtype(self) -> "TelemetryTypeConfig":
+        if self.storage_dtype == "int16":
+            value_range = self.range or {}
+            if not ("min" in value_range and "max" in value_range and value_range["max"] > value_range["min"]):
+                raise ValueError("int16 storage requires a range with min < max")
+        return self
 
 
 class CommandParameter(BaseModel):
@@ -57,12 +73,17 @@ class CommandTemplatesResponse(BaseModel):
 
 
 class HistoricalDataQuery(BaseModel):
-    """Query parameters for historical data requests."""
+    """
+    Query parameters for historical data requests.
+    Used directly as the GET /historical-data dependency, where the timestamps are the `since`/`until` parameters.
+    """
+    model_config = ConfigDict(populate_by_name=True)
+
     id: Optional[str] = None  # Filter by telemetry ID, if applicable (e.g., "temperature", "command_confirmation")
     type: Optional[str] = None  # Filter by message type (e.g., "data")
-    limit: Optional[int] = None  # Maximum records to return
-    from_timestamp: Optional[str] = None  # ISO timestamp, defaults to first record
-    to_timestamp: Optional[str] = None  # ISO timestamp, defaults to last record
+    limit: Optional[PositiveInt] = None  # Maximum records to return, at least 1
+    from_timestamp: Optional[datetime] = Field(None, alias="since")  # Parsed from ISO timestamp, defaults to first record
+    to_timestamp: Optional[datetime] = Field(None, alias="until")  # Parsed from ISO timestamp, defaults to last record
 
 
 class HistoricalDataResponse(BaseModel):
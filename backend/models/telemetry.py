@@ -2,6 +2,7 @@ from pydantic import BaseModel, RootModel, Field
 from typing import Union, Dict, Any, List, Annotated, Literal
 from datetime import datetime
 from .commands import Command, CommandResult
+from .clock import current_dt
 
 
 class TelemetryMessage(BaseModel):
@@ -21,7 +22,7 @@ class CommandMessage(Command):
     Extends the base Command class with message type information.
     """
     type: Literal["command"] = "command"
-    timestamp: datetime = Field(default_factory=datetime.now)  # When command was received
+    timestamp: datetime = Field(default_factory=current_dt)  # When command was received
     
 class CommandResultMessage(BaseModel):
     """
@@ -30,7 +31,7 @@ class CommandResultMessage(BaseModel):
     type: Literal["command_result"] = "command_result"
     id: str = "command_result"
     value: CommandResult
-    timestamp: datetime = Field(default_factory=datetime.now)  # When result was generated
+    timestamp: datetime = Field(default_factory=current_dt)  # When result was generated
 
 class DeviceMessage(BaseModel):
     """
@@ -50,4 +51,12 @@ class GenericMessage(RootModel):
     root: Annotated[
         Union[TelemetryMessage, CommandMessage, CommandResultMessage, DeviceMessage],
         Field(discriminator='type')
-    ]
\ No newline at end of file
+    ]
+
+def encode_message(message: GenericMessage) -> bytes:
+    """
+    Serialize a message to JSON bytes, as sent to clients and kept in history.
+    Calls the pydantic-core serializer directly: same output as model_dump_json(),
+    without building a str and encoding it again.
+    """
+    return message.__pydantic_serializer__.to_json(message)
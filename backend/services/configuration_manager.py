@@ -1,17 +1,39 @@
 import json
 import logging
 from datetime import datetime
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Callable, Tuple
 
 from models.configuration import (
     TelemetryTypesResponse, 
     CommandTemplatesResponse,
     TelemetryTypeConfig,
-    CommandTemplate
+    CommandTemplate,
+    DataType
 )
+from services.websocket_manager import websocket_manager
 
 logger = logging.getLogger(__name__)
 
+# Python types accepted for each command parameter type
+_PARAMETER_TYPES: Dict[str, tuple] = {
+    "string": (str,),
+    "int": (int,),
+    "float": (int, float),
+    "boolean": (bool,),
+}
+
+# Python types accepted for each telemetry data type that is type checked, with the error for other values.
+# The first item is the type values usually have, checked exactly before falling back to isinstance()
+_TELEMETRY_VALUE_TYPES: Dict[DataType, Tuple[type, tuple, str]] = {
+    DataType.FLOAT: (float, (int, float), "Value must be a float or int"),
+    DataType.INT: (int, (int,), "Value must be an int"),
+    DataType.STRING: (str, (str,), "Value must be a string"),
+    DataType.BOOLEAN: (bool, (bool,), "Value must be a boolean"),
+}
+
+CommandValidator = Callable[[Dict[str, Any]], Tuple[bool, Optional[str]]]
+TelemetryValidator = Callable[[Any], Tuple[bool, Optional[str]]]
+
 
 class ConfigurationManager:
     """
@@ -24,6 +46,11 @@ class ConfigurationManager:
         self.command_templates: Dict[str, CommandTemplate] = {}
         self.last_updated: datetime = datetime.now()
         self.device_connected: bool = False
+
+        # Validators compiled per command template, stored with the template they were built from
+        self._compiled_cmd_validators: Dict[str, Tuple[CommandTemplate, CommandValidator]] = {}
+        # Validators compiled per telemetry type, stored with the configuration they were built from
+        self._compiled_telemetry_validators: Dict[str, Tuple[TelemetryTypeConfig, TelemetryValidator]] = {}
         
         logger.info("Configuration manager initialized - waiting for device configuration")
     
@@ -57,6 +84,15 @@ class ConfigurationManager:
             # Update stored configuration
             self.telemetry_types = validated_telemetry_types
             self.command_templates = validated_command_templates
+            self._compiled_cmd_validators = {
+                key: (template, self._compile_command_validator(key, template))
+                for key, template in validated_command_templates.items()
+            }
+            self._compiled_telemetry_validators = {
+                key: (config, self._compile_telemetry_validator(config))
+                for key, config in validated_telemetry_types.items()
+            }
+            websocket_manager.register_numeric_series(self.telemetry_types)
             self.last_updated = datetime.now()
             self.device_connected = True
             
@@ -79,6 +115,9 @@ class ConfigurationManager:
         """
         self.telemetry_types.clear()
         self.command_templates.clear()
+        self._compiled_cmd_validators.clear()
+        self._compiled_telemetry_validators.clear()
+        websocket_manager.register_numeric_series(self.telemetry_types)
         self.device_connected = False
         self.last_updated = datetime.now()
         
@@ -166,41 +205,75 @@ class ConfigurationManager:
         Returns:
             Tuple of (is_valid, error_message). If valid, error_message is None.
         """
-        try:
-            config = self.get_telemetry_type(type_id)
-            
-            # Check data type
-            if config.data_type.value == "float":
-                if not isinstance(value, (int, float)):
-                    return False, "Value must be a float or int"
-                value = float(value)
-            elif config.data_type.value == "int":
-                if not isinstance(value, int):
-                    return False, "Value must be an int"
-            elif config.data_type.value == "string":
-                if not isinstance(value, str):
-                    return False, "Value must be a string"
-            elif config.data_type.value == "boolean":
-                if not isinstance(value, bool):
-                    return False, "Value must be a boolean"
+        config = self.telemetry_types.get(type_id)
+        if config is None:
+            return False, "Unknown telemetry type"
 
-            # Check range constraints
-            if config.range and isinstance(value, (int, float)):
-                min_val = config.range.get("min")
-                max_val = config.range.get("max")
-                if min_val is not None and value < min_val:
-                    return False, f"Value must be greater than or equal to {min_val}"
-                if max_val is not None and value > max_val:
-                    return False, f"Value must be less than or equal to {max_val}"
+        compiled = self._compiled_telemetry_validators.get(type_id)
+        if compiled is None or compiled[0] is not config:
+            # Type was added or replaced without going through registration
+            compiled = (config, self._compile_telemetry_validator(config))
+            self._compiled_telemetry_validators[type_id] = compiled
 
-            # Check enum constraints
-            if config.enum and value not in config.enum:
-                return False, f"Value must be one of {config.enum}"
+        return compiled[1](value)
 
-            return True, None
+    @staticmethod
+    def _compile_telemetry_validator(config: TelemetryTypeConfig) -> TelemetryValidator:
+        """
+        Build a validator specialised for a telemetry type configuration.
+        
+        The source of a flat function is generated with only the checks that apply to the type,
+        then compiled once. Checks run cheapest and most likely to fail first: an exact type check
+        (falling back to isinstance()), the range bounds that drifting sensors cross, then the enum. Constants and error messages are
+        passed in as the function's globals, so configuration values never end up in the source.
+        
+        Args:
+            config: The telemetry type configuration to compile
             
-        except KeyError:
-            return False, "Unknown telemetry type"
+        Returns:
+            A function taking a value and returning (is_valid, error_message)
+        """
+        namespace: Dict[str, Any] = {}
+        lines = ["def validate(value):"]
+
+        type_check = _TELEMETRY_VALUE_TYPES.get(config.data_type)
+        if type_check is not None:
+            namespace["_exact_type"], namespace["_types"], namespace["_type_error"] = type_check
+            lines.append(
+                "    if type(value) is not _exact_type and not isinstance(value, _types): return False, _type_error"
+            )
+
+        # Check range constraints, only numeric values have a range
+        value_range = config.range or {}
+        bounds = [
+            (op, name, error, value_range.get(name))
+            for op, name, error in (("<", "min", "greater"), (">", "max", "less"))
+            if value_range.get(name) is not None
+        ]
+        if bounds:
+            indent = "    "
+            if config.data_type not in (DataType.INT, DataType.FLOAT):
+                lines.append("    if isinstance(value, (int, float)):")
+                indent = "        "
+            for op, name, error, bound in bounds:
+                namespace[f"_{name}"] = bound
+                namespace[f"_{name}_error"] = f"Value must be {error} than or equal to {bound}"
+                lines.append(f"{indent}if value {op} _{name}: return False, _{name}_error")
+
+        # Check enum constraints (unhashable values can never match a scalar enum)
+        if config._enum_set is not None:
+            namespace["_enum_set"] = config._enum_set
+            namespace["_enum_error"] = f"Value must be one of {config.enum}"
+            lines.extend([
+                "    try:",
+                "        if value not in _enum_set: return False, _enum_error",
+                "    except TypeError:",
+                "        return False, _enum_error",
+            ])
+
+        lines.append("    return True, None")
+        exec(compile("\n".join(lines), f"<telemetry validator: {config.data_type.value}>", "exec"), namespace)
+        return namespace["validate"]
 
     def validate_command(self, command_id: str, parameters: Dict[str, Any]) -> tuple[bool, Optional[str]]:
         """
@@ -213,68 +286,63 @@ class ConfigurationManager:
         Returns:
             Tuple of (is_valid, error_message). If valid, error_message is None.
         """
-        try:
-            template = self.get_command_template(command_id)
-            
-            # Check required parameters
-            for param_name, param_config in template.parameters.items():
-                if param_config.required and param_name not in parameters:
-                    return False, f"Required parameter '{param_name}' is missing"
-            
-            # Validate each provided parameter
-            for param_name, param_value in parameters.items():
-                if param_name not in template.parameters:
-                    return False, f"Unknown parameter '{param_name}' for command '{command_id}'"
-                
-                param_config = template.parameters[param_name]
-                
-                # Validate parameter type
-                if not self._validate_parameter_type(param_value, param_config.type):
-                    return False, f"Parameter '{param_name}' has invalid type. Expected {param_config.type}"
-                
-                # Validate enum constraints
-                if param_config.enum and param_value not in param_config.enum:
-                    return False, f"Parameter '{param_name}' value '{param_value}' not in allowed values: {param_config.enum}"
-            
-            return True, None
-            
-        except KeyError:
+        template = self.command_templates.get(command_id)
+        if template is None:
             return False, f"Command '{command_id}' not found in registered templates"
+
+        compiled = self._compiled_cmd_validators.get(command_id)
+        if compiled is None or compiled[0] is not template:
+            # Template was added or replaced without going through registration
+            compiled = (template, self._compile_command_validator(command_id, template))
+            self._compiled_cmd_validators[command_id] = compiled
+
+        return compiled[1](parameters)
     
-    def _validate_parameter_type(self, value: Any, expected_type: str) -> tuple[bool, Optional[str]]:
+    @staticmethod
+    def _compile_command_validator(command_id: str, template: CommandTemplate) -> CommandValidator:
         """
-        Validate that a parameter value matches the expected type.
+        Build a validator specialised for a command template.
+        
+        The template is walked once here, so each validation only runs the
+        type and enum checks, with no template or model attribute lookups.
         
         Args:
-            value: The value to validate
-            expected_type: The expected type string ("string", "int", "float", "boolean")
+            command_id: The command identifier, used in error messages
+            template: The command template to compile
             
         Returns:
-            True if the value matches the expected type
+            A function taking the command parameters and returning (is_valid, error_message)
         """
-        if expected_type == "string":
-            if not isinstance(value, str):
-                return False, "Value must be a string"
-            else: 
-                return True, None
-        elif expected_type == "int":
-            if not isinstance(value, int):
-                return False, "Value must be an int"
-            else:
-                return True, None
-        elif expected_type == "float":
-            if not isinstance(value, (int, float)):
-                return False, "Value must be a float"
-            else:
-                return True, None
-        elif expected_type == "boolean":
-            if not isinstance(value, bool):
-                return False, "Value must be a boolean"
-            else:
-                return True, None
-        else:
-            # Unknown type, assume not valid
-            return False, f"Unknown parameter type '{expected_type}'"
+        required = tuple(name for name, param in template.parameters.items() if param.required)
+        specs = {
+            name: (
+                _PARAMETER_TYPES.get(param.type, ()),
+                param.type,
+                frozenset(param.enum) if param.enum else None,
+                param.enum
+            )
+            for name, param in template.parameters.items()
+        }
+
+        def validate(parameters: Dict[str, Any]) -> Tuple[bool, Optional[str]]:
+            for name in required:
+                if name not in parameters:
+                    return False, f"Required parameter '{name}' is missing"
+
+            for name, value in parameters.items():
+                spec = specs.get(name)
+                if spec is None:
+                    return False, f"Unknown parameter '{name}' for command '{command_id}'"
+
+                types, type_name, enum_set, enum = spec
+                if not isinstance(value, types):
+                    return False, f"Parameter '{name}' has invalid type. Expected {type_name}"
+                if enum_set is not None and value not in enum_set:
+                    return False, f"Parameter '{name}' value '{value}' not in allowed values: {enum}"
+
+            return True, None
+
+        return validate
     
     def get_configuration_summary(self) -> Dict[str, Any]:
         """
@@ -296,3 +364,6 @@ class ConfigurationManager:
 
 # Global configuration manager instance
 config_manager = ConfigurationManager()
+
+# Incoming commands are validated against the registered command templates
+websocket_manager.command_validator = config_manager.validate_command
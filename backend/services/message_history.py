@@ -0,0 +1,158 @@
+from collections import deque
+from datetime import datetime
+from itertools import islice
+from typing import Deque, Dict, Iterator, List, NamedTuple, Optional
+
+from sortedcontainers import SortedList
+
+from models.telemetry import GenericMessage, encode_message
+
+
+class HistoryEntry(NamedTuple):
+    """A stored message with its index key and its JSON encoding."""
+    timestamp_key: int  # Epoch microseconds of the message timestamp
+    sequence: int  # Insertion counter, keeps keys unique and ties in arrival order
+    message: GenericMessage
+    payload: bytes  # The message serialized to JSON, reused when serving history
+
+
+def timestamp_key(timestamp: datetime) -> int:
+    """Convert a datetime to integer epoch microseconds, the key used by the time index."""
+    return round(timestamp.timestamp() * 1_000_000)
+
+
+class MessageHistory:
+    """
+    Bounded in-memory log of broadcast messages.
+    Messages are kept in arrival order in a fixed-capacity ring buffer, with a sorted
+    timestamp index so that time window queries bisect instead of scanning the whole log,
+    and per message type and per message id indexes so that filtered queries only visit matching entries.
+    """
+
+    def __init__(self, max_size: int):
+        if max_size < 1:
+            raise ValueError(f"History size must be at least 1, got {max_size}")
+        self.max_size = max_size
+        self._ring: List[Optional[HistoryEntry]] = [None] * max_size
+        self._head = 0  # Number of entries appended since the last clear; the next slot is _head % max_size
+        self._by_time: SortedList = SortedList()
+        # Entries in arrival order for each message type and each message id; the ring always
+        # evicts the oldest entry overall, which is also the oldest one of its type and id
+        self._by_type: Dict[str, Deque[HistoryEntry]] = {}
+        self._by_id: Dict[str, Deque[HistoryEntry]] = {}
+
+    def append(self, message: GenericMessage, payload: Optional[bytes] = None) -> None:
+        """
+        Add a message, overwriting the oldest one (FIFO) once the size limit is reached.
+
+        Args:
+            message: The message to store
+            payload: The message already serialized to JSON, if available; encoded here otherwise
+        """
+        if payload is None:
+            payload = encode_message(message)
+
+        entry = HistoryEntry(timestamp_key(message.root.timestamp), self._head, message, payload)
+
+        # (TODO) Implement storing in different files, to not lose data (except otherwise specified)
+        slot = self._head % self.max_size
+        evicted = self._ring[slot]
+        if evicted is not None:
+            self._by_time.remove(evicted)
+            self._unindex(self._by_type, evicted.message.root.type)
+            self._unindex(self._by_id, getattr(evicted.message.root, "id", None))
+        self._ring[slot] = entry
+        self._by_time.add(entry)
+        self._by_type.setdefault(message.root.type, deque()).append(entry)
+        message_id = getattr(message.root, "id", None)
+        if message_id is not None:
+            self._by_id.setdefault(message_id, deque()).append(entry)
+        self._head += 1
+
+    @staticmethod
+    def _unindex(index: Dict[str, Deque[HistoryEntry]], key: Optional[str]) -> None:
+        """Drop the oldest entry under `key`, removing the key once it has no entries left."""
+        if key is None:
+            return
+        entries = index[key]
+        entries.popleft()
+        if not entries:
+            del index[key]
+
+    def between(self, since: Optional[datetime] = None, until: Optional[datetime] = None) -> List[HistoryEntry]:
+        """
+        Get entries with a timestamp strictly after `since` and strictly before `until`.
+
+        Args:
+            since: Exclusive lower bound, or None for no lower bound
+            until: Exclusive upper bound, or None for no upper bound
+
+        Returns:
+            Matching entries ordered by timestamp
+        """
+        start = 0
+        if since is not None:
+            start = self._by_time.bisect_right((timestamp_key(since), float("inf")))
+
+        end = len(self._by_time)
+        if until is not None:
+            end = self._by_time.bisect_left((timestamp_key(until), -1))
+
+        return self._by_time[start:end]
+
+    def entries(self) -> List[HistoryEntry]:
+        """Get all entries in arrival order."""
+        if self._head <= self.max_size:
+            return self._ring[:self._head]
+        slot = self._head % self.max_size
+        return self._ring[slot:] + self._ring[:slot]
+
+    def matching(self, message_type: Optional[str] = None, message_id: Optional[str] = None,
+                 limit: Optional[int] = None) -> List[HistoryEntry]:
+        """
+        Get entries with the given message type and/or message id, in arrival order.
+        Only the entries of the smaller matching index are visited, newest first, until the limit is reached.
+
+        Args:
+            message_type: Required message type, or None for any type
+            message_id: Required message id, or None for any id (messages without an id never match one)
+            limit: Maximum number of (most recent) entries to return, or None for all of them
+        """
+        pools = []
+        if message_type is not None:
+            pools.append(self._by_type.get(message_type, ()))
+        if message_id is not None:
+            pools.append(self._by_id.get(message_id, ()))
+        if not pools:
+            return self.entries() if limit is None else self.latest(limit)
+
+        pool = min(pools, key=len)
+        matches = reversed(pool)
+        if len(pools) == 2:
+            matches = (
+                entry for entry in matches
+                if entry.message.root.type == message_type and getattr(entry.message.root, "id", None) == message_id
+            )
+        entries = list(islice(matches, limit))
+        entries.reverse()
+        return entries
+
+    def latest(self, count: int) -> List[HistoryEntry]:
+        """Get the `count` most recent entries in arrival order, without copying the rest of the log."""
+        count = min(count, len(self))
+        return [self._ring[index % self.max_size] for index in range(self._head - count, self._head)]
+
+    def clear(self) -> None:
+        """Remove all messages from the log."""
+        self._ring = [None] * self.max_size
+        self._head = 0
+        self._by_time.clear()
+        self._by_type.clear()
+        self._by_id.clear()
+
+    def __len__(self) -> int:
+        return min(self._head, self.max_size)
+
+    def __iter__(self) -> Iterator[GenericMessage]:
+        """Iterate over messages in arrival order."""
+        return (entry.message for entry in self.entries())
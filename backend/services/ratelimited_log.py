@@ -0,0 +1,70 @@
+import atexit
+import logging
+import queue
+import time
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any
+
+
+class RateLimitedLogger:
+    """
+    Logger wrapper for hot paths that can fail repeatedly (e.g. a client sending a storm of bad messages).
+    Lets through at most `rate` records per `per` seconds (token bucket, shared by all levels);
+    the number of suppressed records is appended to the next record that gets through.
+    """
+
+    def __init__(self, logger: logging.Logger, rate: int = 10, per: float = 60.0):
+        self.logger = logger
+        self.rate = rate
+        self.per = per
+        self._tokens = float(rate)
+        self._last_refill = time.monotonic()
+        self._suppressed = 0
+
+    def _allow(self) -> bool:
+        """Take a token, refilling the bucket for the time elapsed since the last call."""
+        now = time.monotonic()
+        self._tokens = min(self.rate, self._tokens + (now - self._last_refill) * self.rate / self.per)
+        self._last_refill = now
+        if self._tokens < 1:
+            self._suppressed += 1
+            return False
+        self._tokens -= 1
+        return True
+
+    def log(self, level: int, msg: str, *args: Any, **kwargs: Any) -> None:
+        if not self.logger.isEnabledFor(level) or not self._allow():
+            return
+        if self._suppressed:
+            msg = f"{msg} ({self._suppressed} similar messages suppressed)"
+            self._suppressed = 0
+        self.logger.log(level, msg, *args, **kwargs)
+
+    def error(self, msg: str, *args: Any, **kwargs: Any) -> None:
+        self.log(logging.ERROR, msg, *args, **kwargs)
+
+    def warning(self, msg: str, *args: Any, **kwargs: Any) -> None:
+        self.log(logging.WARNING, msg, *args, **kwargs)
+
+    def info(self, msg: str, *args: Any, **kwargs: Any) -> None:
+        self.log(logging.INFO, msg, *args, **kwargs)
+
+
+def configure_logging(level: int = logging.INFO) -> QueueListener:
+    """
+    Configure root logging so that records are only queued on the calling thread
+    and written to the console by a background listener thread.
+    """
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    console = logging.StreamHandler()
+    console.setFormatter(logging.Formatter(logging.BASIC_FORMAT))
+
+    # The queue handler only merges the arguments into the message, the console handler adds the rest
+    queue_handler = QueueHandler(log_queue)
+    queue_handler.setFormatter(logging.Formatter("%(message)s"))
+
+    logging.basicConfig(level=level, handlers=[queue_handler])
+    listener = QueueListener(log_queue, console, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
@@ -1,15 +1,159 @@
 import asyncio
-import random
 import logging
-from datetime import datetime
-from typing import Dict, Any, Optional
+from typing import Annotated, Any, Awaitable, Callable, Dict, Literal, Optional
 
+import numpy as np
+from pydantic import Field, TypeAdapter, ValidationError
+
+from models.clock import current_dt
 from models.telemetry import TelemetryMessage, CommandResultMessage, GenericMessage
 from models.commands import Command, CommandResult, CommandStatus
 from services.websocket_manager import websocket_manager
+from services.configuration_manager import config_manager
 
 logger = logging.getLogger(__name__)
 
+# Telemetry types the simulator registers, based on its sensors
+_TELEMETRY_TYPES: Dict[str, Dict[str, Any]] = {
+    "temperature": {
+        "unit": "°C",
+        "data_type": "float",
+        "range": {"min": 18.0, "max": 35.0},
+        "storage_dtype": "float32",
+        "description": "Ambient temperature sensor reading"
+    },
+    "pressure": {
+        "unit": "hPa", 
+        "data_type": "float",
+        "range": {"min": 980.0, "max": 1050.0},
+        "storage_dtype": "float32",
+        "description": "Atmospheric pressure measurement"
+    },
+    "humidity": {
+        "unit": "%",
+        "data_type": "float", 
+        "range": {"min": 20.0, "max": 80.0},
+        "storage_dtype": "float32",
+        "description": "Relative humidity percentage"
+    },
+    "system_status": {
+        "unit": None,
+        "data_type": "string",
+        "enum": ["operational", "warning", "error", "maintenance"],
+        "description": "Current system operational status"
+    }
+}
+
+# Command templates the simulator registers, based on its supported commands
+_COMMAND_TEMPLATES: Dict[str, Dict[str, Any]] = {
+    "set_update_interval": {
+        "command": "set_update_interval",
+        "parameters": {
+            "interval": {
+                "type": "float",
+                "required": True,
+                "description": "Update interval in seconds (0.1 to 60.0)"
+            }
+        },
+        "description": "Change the telemetry data update frequency"
+    },
+    "reset_sensors": {
+        "command": "reset_sensors", 
+        "parameters": {},
+        "description": "Reset all sensors to their default calibrated values"
+    },
+    "set_sensor_value": {
+        "command": "set_sensor_value",
+        "parameters": {
+            "sensor_id": {
+                "type": "string",
+                "required": True,
+                "enum": ["temperature", "pressure", "humidity", "system_status"],
+                "description": "The ID of the sensor to modify"
+            },
+            "value": {
+                "type": "string",
+                "required": True,
+                "description": "New value for the sensor"
+            }
+        },
+        "description": "Set a specific sensor to a specific value"
+    },
+    "get_status": {
+        "command": "get_status",
+        "parameters": {},
+        "description": "Get current simulator status and sensor values"
+    },
+    "calibrate_sensors": {
+        "command": "calibrate_sensors",
+        "parameters": {
+            "duration": {
+                "type": "float",
+                "required": False,
+                "description": "Calibration duration in seconds (1.0 to 30.0, default 5.0)"
+            }
+        },
+        "description": "Perform sensor calibration - long-running operation"
+    }
+}
+
+
+def advance_numeric(values: np.ndarray, mins: np.ndarray, maxs: np.ndarray, drifts: np.ndarray,
+                    draws: np.ndarray, out: np.ndarray) -> np.ndarray:
+    """
+    Drift numeric sensor values by (2 * draw - 1) * drift, clamped to [min, max].
+    The drifted values are written to `out` and `values` is updated in place to them rounded to 2 decimals.
+    Uses plain ufuncs on preallocated buffers: for a handful of sensors the cost is per call,
+    and np.clip / np.round add Python-level overhead and temporaries on top of the ufuncs they wrap.
+    """
+    np.multiply(draws, 2, out=out)
+    np.subtract(out, 1, out=out)
+    np.multiply(out, drifts, out=out)
+    np.add(out, values, out=out)
+    np.maximum(out, mins, out=out)
+    np.minimum(out, maxs, out=out)
+    np.multiply(out, 100, out=values)
+    np.rint(values, out=values)
+    np.divide(values, 100, out=values)
+    return out
+
+
+def sensor_value_adapter(config: Dict[str, Any]) -> TypeAdapter:
+    """
+    Build the validator for values set on a sensor with set_sensor_value: one of the options
+    for discrete sensors, a float (numeric strings are accepted) within [min, max] otherwise.
+    """
+    if "options" in config:
+        return TypeAdapter(Literal[tuple(config["options"])])
+    return TypeAdapter(Annotated[float, Field(ge=config["min"], le=config["max"])])
+
+
+class NumericSensorView(dict):
+    """
+    Configuration dict of a numeric sensor whose "value" is also held in the simulator's value array.
+    Writing "value" (sensors[id]["value"] = x, update()) writes the array too, and each tick copies
+    the advanced array back into the dict, so the dict stays a complete, ordinary dict of the sensor.
+    """
+    
+    def __init__(self, values: np.ndarray, index: int, config: Dict[str, Any]):
+        super().__init__(config)
+        self._values = values
+        self._index = index
+    
+    def __setitem__(self, key: str, value: Any) -> None:
+        if key == "value":
+            self._values[self._index] = value
+            value = float(self._values[self._index])
+        super().__setitem__(key, value)
+    
+    def update(self, *args: Any, **kwargs: Any) -> None:
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+    
+    def sync(self, value: float) -> None:
+        """Store the array's current value in the dict, after the array was advanced in place."""
+        super().__setitem__("value", value)
+
 
 class TelemetrySimulator:
     """
@@ -20,6 +164,21 @@ class TelemetrySimulator:
     def __init__(self):
         self.is_running = False
         self.simulation_task: Optional[asyncio.Task] = None
+        # Set by stop(), ends the simulation loop without cancelling it
+        self._stop_event = asyncio.Event()
+        self._loop_task: Optional[asyncio.Task] = None
+        # Command handlers, keyed by command id
+        self._command_handlers: Dict[str, Callable[[Command], Awaitable[Optional[CommandResult]]]] = {
+            "set_update_interval": self._cmd_set_update_interval,
+            "reset_sensors": self._cmd_reset_sensors,
+            "set_sensor_value": self._cmd_set_sensor_value,
+            "get_status": self._cmd_get_status,
+            # Long-running command that demonstrates pending → success flow, it sends its own results
+            "calibrate_sensors": self._handle_calibration_command,
+        }
+        
+        # Task group of the running simulation, owns the loop and any background command tasks
+        self._task_group: Optional[asyncio.TaskGroup] = None
         
         # Simulation parameters
         self.update_interval = 2.0  # seconds between telemetry updates
@@ -54,6 +213,27 @@ class TelemetrySimulator:
             }
         }
         
+        # Numeric sensors (those with a drift) as parallel arrays, advanced together each tick
+        self._num_ids = [sensor_id for sensor_id, config in self.sensors.items() if "drift" in config]
+        self._num_index = {sensor_id: index for index, sensor_id in enumerate(self._num_ids)}
+        self._num_values = np.array([self.sensors[sensor_id]["value"] for sensor_id in self._num_ids], dtype=np.float64)
+        self._num_mins = np.array([self.sensors[sensor_id]["min"] for sensor_id in self._num_ids], dtype=np.float64)
+        self._num_maxs = np.array([self.sensors[sensor_id]["max"] for sensor_id in self._num_ids], dtype=np.float64)
+        self._num_drifts = np.array([self.sensors[sensor_id]["drift"] for sensor_id in self._num_ids], dtype=np.float64)
+        # Discrete state sensors (e.g. system_status), changing to a random option now and then
+        self._discrete_ids = [sensor_id for sensor_id in self.sensors if sensor_id not in self._num_index]
+        self._rng = np.random.default_rng()
+        # Per-tick buffers, reused so a tick does not allocate arrays
+        self._draws = np.empty(len(self._num_ids) + len(self._discrete_ids), dtype=np.float64)
+        self._num_next = np.empty(len(self._num_ids), dtype=np.float64)
+        for index, sensor_id in enumerate(self._num_ids):
+            self.sensors[sensor_id] = NumericSensorView(self._num_values, index, self.sensors[sensor_id])
+        self._num_views = [self.sensors[sensor_id] for sensor_id in self._num_ids]
+        # set_sensor_value validators, built once per sensor
+        self._sensor_value_adapters = {
+            sensor_id: sensor_value_adapter(config) for sensor_id, config in self.sensors.items()
+        }
+        
     async def start(self) -> None:
         """Start the telemetry simulation."""
         if self.is_running:
@@ -61,11 +241,15 @@ class TelemetrySimulator:
             return
             
         self.is_running = True
-        self.simulation_task = asyncio.create_task(self._simulation_loop())
+        self._stop_event = asyncio.Event()
         
-        # Register configuration with config manager
+        # Register configuration with config manager before the first tick, so its numeric series exist
         await self._register_device_configuration()
         
+        started = asyncio.Event()
+        self.simulation_task = asyncio.create_task(self.run(started))
+        await started.wait()
+        
         logger.info("Telemetry simulator started")
         
     async def stop(self) -> None:
@@ -74,12 +258,18 @@ class TelemetrySimulator:
             return
             
         self.is_running = False
+        self._stop_event.set()
         if self.simulation_task:
+            # The loop returns on its own once it sees the stop event...
+            if self._loop_task:
+                await self._loop_task
+            # ...then anything still running in the task group (e.g. a calibration) is cancelled
             self.simulation_task.cancel()
             try:
                 await self.simulation_task
             except asyncio.CancelledError:
                 pass
+            self.simulation_task = None
         
         # Unregister configuration
         await self._unregister_device_configuration()
@@ -88,32 +278,61 @@ class TelemetrySimulator:
     
     async def _unregister_device_configuration(self) -> None:
         """Unregister this simulator's configuration from the configuration manager."""
-        # Import here to avoid circular dependency
-        from services.configuration_manager import config_manager
-        
         config_manager.unregister_device("telemetry_simulator")
         logger.info("Simulator configuration unregistered")
         
+    async def run(self, started: Optional[asyncio.Event] = None) -> None:
+        """
+        Run the simulation loop and the background tasks it starts (e.g. calibrations) in one task group.
+        The loop ends when the stop event is set; cancelling the run then cancels and awaits
+        the remaining tasks, so stop() leaves no orphaned tasks.
+        
+        Args:
+            started: Set once the task group accepts background tasks
+        """
+        try:
+            async with asyncio.TaskGroup() as task_group:
+                self._task_group = task_group
+                self._loop_task = task_group.create_task(self._simulation_loop())
+                if started is not None:
+                    started.set()
+        finally:
+            self._task_group = None
+            self._loop_task = None
+    
     async def _simulation_loop(self) -> None:
         """Main simulation loop that generates and sends telemetry data."""
+        loop = asyncio.get_running_loop()
+        next_tick = loop.time()
         try:
-            while self.is_running:
-                # Generate telemetry for each sensor
-                for sensor_id, sensor_config in self.sensors.items():
-                    telemetry_data = self._generate_sensor_data(sensor_id, sensor_config)
-                    
-                    # Telemetry message
-                    message = TelemetryMessage(
-                        id=sensor_id,
-                        value=telemetry_data["value"],
-                        timestamp=datetime.now()
-                    )
-                    
-                    # Wrap in GenericMessage for broadcasting
-                    generic_message = GenericMessage(root=message)
-                    await websocket_manager.broadcast_message(generic_message)
+            while not self._stop_event.is_set():
+                # Generate telemetry for each sensor, all stamped with the same tick time
+                timestamp = current_dt()
+                values = self._tick()
+                # Telemetry messages, wrapped in GenericMessage for broadcasting
+                messages = [
+                    GenericMessage(root=TelemetryMessage(id=sensor_id, value=values[sensor_id], timestamp=timestamp))
+                    for sensor_id in self.sensors
+                ]
                 
-                await asyncio.sleep(self.update_interval)
+                # One broadcast per tick, sent to each client as a single frame
+                await websocket_manager.broadcast_messages(messages)
+                
+                # Ticks keep a fixed cadence: the time spent on this tick comes out of the wait
+                next_tick += self.update_interval
+                delay = next_tick - loop.time()
+                if delay < 0:
+                    # Fell behind (e.g. the loop was blocked), restart the cadence instead of bursting ticks
+                    next_tick = loop.time()
+                    delay = 0
+                
+                # Wait for the next tick, waking up right away if stop() is called
+                try:
+                    await asyncio.wait_for(self._stop_event.wait(), timeout=delay)
+                except TimeoutError:
+                    pass
+            
+            logger.info("Simulation loop stopped")
                 
         except asyncio.CancelledError:
             logger.info("Simulation loop cancelled")
@@ -124,94 +343,10 @@ class TelemetrySimulator:
     
     async def _register_device_configuration(self) -> None:
         """Register this simulator's configuration with the configuration manager."""
-        # Import here to avoid circular dependency
-        from services.configuration_manager import config_manager
-        
-        # Define telemetry types based on our sensors
-        telemetry_types = {
-            "temperature": {
-                "unit": "°C",
-                "data_type": "float",
-                "range": {"min": 18.0, "max": 35.0},
-                "description": "Ambient temperature sensor reading"
-            },
-            "pressure": {
-                "unit": "hPa", 
-                "data_type": "float",
-                "range": {"min": 980.0, "max": 1050.0},
-                "description": "Atmospheric pressure measurement"
-            },
-            "humidity": {
-                "unit": "%",
-                "data_type": "float", 
-                "range": {"min": 20.0, "max": 80.0},
-                "description": "Relative humidity percentage"
-            },
-            "system_status": {
-                "unit": None,
-                "data_type": "string",
-                "enum": ["operational", "warning", "error", "maintenance"],
-                "description": "Current system operational status"
-            }
-        }
-        
-        # Define command templates based on our supported commands
-        command_templates = {
-            "set_update_interval": {
-                "command": "set_update_interval",
-                "parameters": {
-                    "interval": {
-                        "type": "float",
-                        "required": True,
-                        "description": "Update interval in seconds (0.1 to 60.0)"
-                    }
-                },
-                "description": "Change the telemetry data update frequency"
-            },
-            "reset_sensors": {
-                "command": "reset_sensors", 
-                "parameters": {},
-                "description": "Reset all sensors to their default calibrated values"
-            },
-            "set_sensor_value": {
-                "command": "set_sensor_value",
-                "parameters": {
-                    "sensor_id": {
-                        "type": "string",
-                        "required": True,
-                        "enum": ["temperature", "pressure", "humidity", "system_status"],
-                        "description": "The ID of the sensor to modify"
-                    },
-                    "value": {
-                        "type": "string",
-                        "required": True,
-                        "description": "New value for the sensor"
-                    }
-                },
-                "description": "Set a specific sensor to a specific value"
-            },
-            "get_status": {
-                "command": "get_status",
-                "parameters": {},
-                "description": "Get current simulator status and sensor values"
-            },
-            "calibrate_sensors": {
-                "command": "calibrate_sensors",
-                "parameters": {
-                    "duration": {
-                        "type": "float",
-                        "required": False,
-                        "description": "Calibration duration in seconds (1.0 to 30.0, default 5.0)"
-                    }
-                },
-                "description": "Perform sensor calibration - long-running operation"
-            }
-        }
-        
         # Register with configuration manager
         success = config_manager.register_device_configuration(
-            telemetry_types=telemetry_types,
-            command_templates=command_templates,
+            telemetry_types=_TELEMETRY_TYPES,
+            command_templates=_COMMAND_TEMPLATES,
             device_id="telemetry_simulator"
         )
         
@@ -220,31 +355,34 @@ class TelemetrySimulator:
         else:
             logger.error("Failed to register simulator configuration")
             
-    def _generate_sensor_data(self, sensor_id: str, config: Dict[str, Any]) -> Dict[str, Any]:
-        """Generate mock data for a sensor based on its configuration."""
-        if sensor_id == "system_status":
-            # Handle discrete state sensor
-            if random.random() < config.get("change_probability", 0.05):
-                config["value"] = random.choice(config["options"])
-            return {"value": config["value"]}
-        else:
-            # Handle continuous value sensors
-            current_value = config["value"]
-            drift = config["drift"]
-            min_val = config["min"]
-            max_val = config["max"]
-            
-            # Add random drift
-            change = random.uniform(-drift, drift)
-            new_value = current_value + change
-            
-            # Keep within bounds
-            new_value = max(min_val, min(max_val, new_value))
-            
-            # Update stored value
-            config["value"] = round(new_value, 2)
-            
-            return {"value": new_value}
+    def _tick(self) -> Dict[str, Any]:
+        """
+        Advance every sensor by one step, drawing all of the tick's randomness in one RNG call.
+        Numeric sensors drift in one vectorized step (the stored state keeps them rounded to 2 decimals);
+        discrete sensors switch to a random option with their change probability.
+        
+        Returns:
+            The new value of each sensor, by sensor id
+        """
+        num_count = len(self._num_ids)
+        draws = self._rng.random(out=self._draws)
+        
+        # Updates _num_values in place, then copies the stored values back into the sensor dicts
+        new_values = advance_numeric(
+            self._num_values, self._num_mins, self._num_maxs, self._num_drifts,
+            draws[:num_count], self._num_next
+        )
+        for view, value in zip(self._num_views, self._num_values.tolist()):
+            view.sync(value)
+        values: Dict[str, Any] = dict(zip(self._num_ids, new_values.tolist()))
+        
+        for sensor_id, draw in zip(self._discrete_ids, draws[num_count:].tolist()):
+            config = self.sensors[sensor_id]
+            if draw < config.get("change_probability", 0.05):
+                config["value"] = config["options"][self._rng.integers(len(config["options"]))]
+            values[sensor_id] = config["value"]
+        
+        return values
     
     async def handle_command(self, order: Command) -> None:
         """
@@ -257,169 +395,140 @@ class TelemetrySimulator:
             
             # Some commands (like calibration) handle their own messaging
             if result is not None:
-                # Create command result message, wrap in GenericMessage and broadcast
-                command_result_message = CommandResultMessage(value=result)
-                generic_message = GenericMessage(root=command_result_message)
-                await websocket_manager.broadcast_message(generic_message)
+                await self._broadcast_result(result)
             
         except Exception as e:
             logger.error(f"Error executing command {order.command}: {e}")
             
             # Send error result
-            error_result = CommandResult(
+            await self._broadcast_result(CommandResult(
                 command=order.command,
                 status=CommandStatus.ERROR,
                 message=f"Command execution failed: {str(e)}"
-            )
-            
-            command_result_message = CommandResultMessage(
-                value=error_result,
-                timestamp=datetime.now()
-            )
-            
-            generic_message = GenericMessage(root=command_result_message)
-            await websocket_manager.broadcast_message(generic_message)
+            ))
+    
+    async def _broadcast_result(self, result: CommandResult) -> None:
+        """Wrap a command result in a message, stamped now, and broadcast it."""
+        await websocket_manager.broadcast_message(GenericMessage(root=CommandResultMessage(value=result)))
     
     async def _execute_command(self, order: Command) -> Optional[CommandResult]:
         """Execute a specific command and return the result."""
-
-        if order.command == "set_update_interval":
-            # Change simulation update rate
-            new_interval = order.parameters.get("interval", 2.0)
-            if 0.1 <= new_interval <= 60.0:
-                self.update_interval = new_interval
-                return CommandResult(
-                    command=order.command,
-                    status=CommandStatus.SUCCESS,
-                    message=f"Update interval set to {new_interval} seconds"
-                )
-            else:
-                return CommandResult(
-                    command=order.command,
-                    status=CommandStatus.ERROR,
-                    message="Interval must be between 0.1 and 60.0 seconds"
-                )
-
-        elif order.command == "reset_sensors":
-            # Reset all sensors to default values
-            self.sensors["temperature"]["value"] = 22.5
-            self.sensors["pressure"]["value"] = 1013.25
-            self.sensors["humidity"]["value"] = 45.0
-            self.sensors["system_status"]["value"] = "operational"
-            
+        handler = self._command_handlers.get(order.command)
+        if handler is None:
+            return CommandResult(
+                command=order.command,
+                status=CommandStatus.ERROR,
+                message=f"Unknown command: {order.command}"
+            )
+        return await handler(order)
+    
+    async def _cmd_set_update_interval(self, order: Command) -> CommandResult:
+        """Change simulation update rate."""
+        new_interval = order.parameters.get("interval", 2.0)
+        if 0.1 <= new_interval <= 60.0:
+            self.update_interval = new_interval
             return CommandResult(
                 command=order.command,
                 status=CommandStatus.SUCCESS,
-                message="All sensors reset to default values"
+                message=f"Update interval set to {new_interval} seconds"
             )
+        else:
+            return CommandResult(
+                command=order.command,
+                status=CommandStatus.ERROR,
+                message="Interval must be between 0.1 and 60.0 seconds"
+            )
+    
+    async def _cmd_reset_sensors(self, order: Command) -> CommandResult:
+        """Reset all sensors to default values."""
+        self.sensors["temperature"]["value"] = 22.5
+        self.sensors["pressure"]["value"] = 1013.25
+        self.sensors["humidity"]["value"] = 45.0
+        self.sensors["system_status"]["value"] = "operational"
 
-        elif order.command == "set_sensor_value":
-            # Set a specific sensor to a specific value
-            sensor_id = order.parameters.get("sensor_id")
-            value = order.parameters.get("value")
-
-            if sensor_id in self.sensors:
-                if sensor_id == "system_status":
-                    if value in self.sensors[sensor_id]["options"]:
-                        self.sensors[sensor_id]["value"] = value
-                        return CommandResult(
-                            command=order.command,
-                            status=CommandStatus.SUCCESS,
-                            message=f"Sensor {sensor_id} set to {value}"
-                        )
-                    else:
-                        return CommandResult(
-                            command=order.command,
-                            status=CommandStatus.ERROR,
-                            message=f"Invalid value for {sensor_id}. Valid options: {self.sensors[sensor_id]['options']}"
-                        )
-                else:
-                    # Numeric sensor
-                    if value is None:
-                        return CommandResult(
-                            command=order.command,
-                            status=CommandStatus.ERROR,
-                            message="Value parameter is required"
-                        )
-                    
-                    try:
-                        numeric_value = float(value)
-                        min_val = self.sensors[sensor_id]["min"]
-                        max_val = self.sensors[sensor_id]["max"]
-                        
-                        if min_val <= numeric_value <= max_val:
-                            self.sensors[sensor_id]["value"] = numeric_value
-                            return CommandResult(
-                                command=order.command,
-                                status=CommandStatus.SUCCESS,
-                                message=f"Sensor {sensor_id} set to {numeric_value}"
-                            )
-                        else:
-                            return CommandResult(
-                                command=order.command,
-                                status=CommandStatus.ERROR,
-                                message=f"Value must be between {min_val} and {max_val}"
-                            )
-                    except (ValueError, TypeError):
-                        return CommandResult(
-                            command=order.command,
-                            status=CommandStatus.ERROR,
-                            message="Invalid numeric value"
-                        )
-            else:
-                return CommandResult(
-                    command=order.command,
-                    status=CommandStatus.ERROR,
-                    message=f"Unknown sensor: {sensor_id}"
-                )
+        return CommandResult(
+            command=order.command,
+            status=CommandStatus.SUCCESS,
+            message="All sensors reset to default values"
+        )
+    
+    async def _cmd_set_sensor_value(self, order: Command) -> CommandResult:
+        """Set a specific sensor to a specific value."""
+        sensor_id = order.parameters.get("sensor_id")
+        value = order.parameters.get("value")
 
-        elif order.command == "get_status":
-            # Return current simulator status
-            status_info = {
-                "is_running": self.is_running,
-                "update_interval": self.update_interval,
-                "sensor_count": len(self.sensors),
-                "current_values": {k: v["value"] for k, v in self.sensors.items()}
-            }
-            
+        adapter = self._sensor_value_adapters.get(sensor_id)
+        if adapter is None:
             return CommandResult(
                 command=order.command,
-                status=CommandStatus.SUCCESS,
-                message="Simulator status retrieved",
-                details=status_info
+                status=CommandStatus.ERROR,
+                message=f"Unknown sensor: {sensor_id}"
+            )
+        if value is None:
+            return CommandResult(
+                command=order.command,
+                status=CommandStatus.ERROR,
+                message="Value parameter is required"
             )
 
-        elif order.command == "calibrate_sensors":
-            # Long-running command that demonstrates pending → success flow
-            await self._handle_calibration_command(order)
-            # Return None since we handle this command asynchronously
-            return None
-            
-        else:
+        try:
+            new_value = adapter.validate_python(value)
+        except ValidationError as e:
             return CommandResult(
                 command=order.command,
                 status=CommandStatus.ERROR,
-                message=f"Unknown command: {order.command}"
+                message=self._sensor_value_error(sensor_id, e)
             )
 
+        self.sensors[sensor_id]["value"] = new_value
+        return CommandResult(
+            command=order.command,
+            status=CommandStatus.SUCCESS,
+            message=f"Sensor {sensor_id} set to {new_value}"
+        )
+    
+    def _sensor_value_error(self, sensor_id: str, error: ValidationError) -> str:
+        """Describe why a set_sensor_value value was rejected."""
+        config = self.sensors[sensor_id]
+        if "options" in config:
+            return f"Invalid value for {sensor_id}. Valid options: {config['options']}"
+        if error.errors()[0]["type"] in ("greater_than_equal", "less_than_equal"):
+            return f"Value must be between {config['min']} and {config['max']}"
+        return "Invalid numeric value"
+    
+    async def _cmd_get_status(self, order: Command) -> CommandResult:
+        """Return current simulator status."""
+        status_info = {
+            "is_running": self.is_running,
+            "update_interval": self.update_interval,
+            "sensor_count": len(self.sensors),
+            "current_values": {k: v["value"] for k, v in self.sensors.items()}
+        }
 
+        return CommandResult(
+            command=order.command,
+            status=CommandStatus.SUCCESS,
+            message="Simulator status retrieved",
+            details=status_info
+        )
+    
     async def _handle_calibration_command(self, order: Command) -> None:
         """
         Handle calibration command asynchronously with pending → success flow.
         """
+        if self._task_group is None:
+            raise RuntimeError("Simulator is not running")
+        
         # Send immediate pending response
         pending_result = CommandResult(
             command=order.command,
             status=CommandStatus.PENDING,
             message="Calibration started, this will take a few seconds..."
         )
+        await self._broadcast_result(pending_result)
         
-        command_result_message = CommandResultMessage(value=pending_result)
-        generic_message = GenericMessage(root=command_result_message)
-        await websocket_manager.broadcast_message(generic_message)
-        
-        # Start calibration in background
-        asyncio.create_task(self._perform_calibration(order))
+        # Start calibration in background, within the simulation task group
+        self._task_group.create_task(self._perform_calibration(order))
     
     async def _perform_calibration(self, order: Command) -> None:
         """Perform the actual calibration process."""
@@ -446,22 +555,15 @@ class TelemetrySimulator:
                     "duration": calibration_duration
                 }
             )
-            
-            command_result_message = CommandResultMessage(value=success_result)
-            generic_message = GenericMessage(root=command_result_message)
-            await websocket_manager.broadcast_message(generic_message)
+            await self._broadcast_result(success_result)
             
         except Exception as e:
             # Send error response if calibration fails
-            error_result = CommandResult(
+            await self._broadcast_result(CommandResult(
                 command=order.command,
                 status=CommandStatus.ERROR,
                 message=f"Calibration failed: {str(e)}"
-            )
-            
-            command_result_message = CommandResultMessage(value=error_result)
-            generic_message = GenericMessage(root=command_result_message)
-            await websocket_manager.broadcast_message(generic_message)
+            ))
 
 
 # Global simulator instance
@@ -0,0 +1,129 @@
+from typing import Optional, Tuple, Union
+
+import numpy as np
+
+from models.configuration import DataType, TelemetryTypeConfig
+
+# Series dtype and accepted Python value types for each numeric telemetry data type
+_SERIES_TYPES = {
+    DataType.INT: (np.int64, (int,)),
+    DataType.FLOAT: (np.float64, (int, float)),
+}
+
+# Storage dtypes that can be selected with TelemetryTypeConfig.storage_dtype
+_STORAGE_DTYPES = {
+    "float32": np.float32,
+    "int16": np.int16,
+}
+_INT16_STEPS = 65535  # Quantization steps across the configured range
+_INT16_OFFSET = 32768  # Shift from [0, 65535] to the int16 range
+
+
+def is_numeric(data_type: DataType) -> bool:
+    """Check whether a telemetry data type can be stored in a NumericSeries."""
+    return data_type in _SERIES_TYPES
+
+
+class NumericSeries:
+    """
+    Fixed-capacity columnar ring buffer for a single numeric telemetry stream.
+    Timestamps (epoch microseconds, the same key as the history index) and values are
+    kept in parallel NumPy arrays, so time window queries are vectorized.
+    Values use the telemetry type's storage_dtype when set (float32, or int16 quantized over its range).
+    """
+
+    def __init__(self, config: TelemetryTypeConfig, capacity: int):
+        if capacity < 1:
+            raise ValueError(f"Series capacity must be at least 1, got {capacity}")
+        dtype, self._accepted_types = _SERIES_TYPES[config.data_type]
+        self.data_type = config.data_type
+        self.storage_dtype = config.storage_dtype
+        self.capacity = capacity
+
+        # int16 storage quantizes the configured range, values outside it are clamped
+        self.layout = self.layout_for(config)
+        _, _, self._min, self._max = self.layout
+        self._scale = (self._max - self._min) / _INT16_STEPS
+
+        self._timestamps = np.empty(capacity, dtype=np.int64)
+        self._values = np.empty(capacity, dtype=_STORAGE_DTYPES.get(self.storage_dtype, dtype))
+        self._head = 0  # Number of samples appended since the last clear; the next slot is _head % capacity
+        self._ordered = True  # Whether samples were appended in timestamp order, allowing binary search
+
+    @staticmethod
+    def layout_for(config: TelemetryTypeConfig) -> tuple:
+        """Get the storage layout of a telemetry type; stored samples stay valid while it does not change."""
+        if config.storage_dtype == "int16":
+            return (config.data_type, config.storage_dtype, float(config.range["min"]), float(config.range["max"]))
+        return (config.data_type, config.storage_dtype, 0.0, 0.0)
+
+    def append(self, timestamp_key: int, value: Union[int, float]) -> bool:
+        """
+        Add a sample, overwriting the oldest one once the capacity is reached.
+
+        Returns:
+            False if the value does not match the series data type and was not stored
+        """
+        if isinstance(value, bool) or not isinstance(value, self._accepted_types):
+            return False
+
+        if self.storage_dtype == "int16":
+            # Clamp with comparisons rather than min()/max() builtin calls, this runs once per message
+            if value < self._min:
+                value = self._min
+            elif value > self._max:
+                value = self._max
+            value = round((value - self._min) / self._scale) - _INT16_OFFSET
+
+        if self._head and timestamp_key < self._timestamps[(self._head - 1) % self.capacity]:
+            self._ordered = False
+
+        slot = self._head % self.capacity
+        self._timestamps[slot] = timestamp_key
+        self._values[slot] = value
+        self._head += 1
+        return True
+
+    def window(self, since_key: Optional[int] = None, until_key: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Get the samples with a timestamp strictly after `since_key` and strictly before `until_key`.
+
+        Returns:
+            Timestamps and values arrays, ordered by timestamp
+        """
+        timestamps, values = self._arrival_order()
+
+        if not self._ordered:
+            order = np.argsort(timestamps, kind="stable")
+            timestamps, values = timestamps[order], values[order]
+
+        start = 0 if since_key is None else np.searchsorted(timestamps, since_key, side="right")
+        end = len(timestamps) if until_key is None else np.searchsorted(timestamps, until_key, side="left")
+        return timestamps[start:end], self._decode(values[start:end])
+
+    def clear(self) -> None:
+        """Remove all samples."""
+        self._head = 0
+        self._ordered = True
+
+    def __len__(self) -> int:
+        return min(self._head, self.capacity)
+
+    def _decode(self, values: np.ndarray) -> np.ndarray:
+        """Convert stored values back to the series data type scale."""
+        if self.storage_dtype != "int16":
+            return values
+        decoded = (values.astype(np.float64) + _INT16_OFFSET) * self._scale + self._min
+        if self.data_type == DataType.INT:
+            return np.rint(decoded).astype(np.int64)
+        return decoded
+
+    def _arrival_order(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Get the stored samples, oldest first."""
+        if self._head <= self.capacity:
+            return self._timestamps[:self._head], self._values[:self._head]
+        slot = self._head % self.capacity
+        return (
+            np.concatenate((self._timestamps[slot:], self._timestamps[:slot])),
+            np.concatenate((self._values[slot:], self._values[:slot])),
+        )
@@ -1,14 +1,24 @@
-from fastapi import WebSocket
-from typing import List, Optional
+from fastapi import WebSocket, status
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Set, Tuple, Union
+import asyncio
 import json
+from itertools import islice
 import logging
 import os
-from datetime import datetime
+import orjson
+from pydantic import ValidationError
 
-from models.telemetry import CommandMessage, GenericMessage
-from models.configuration import HistoricalDataQuery, HistoricalDataResponse
+from models.telemetry import CommandMessage, GenericMessage, encode_message
+from models.configuration import HistoricalDataQuery, HistoricalDataResponse, TelemetryTypeConfig
+from services.message_history import HistoryEntry, MessageHistory, timestamp_key
+from services.ratelimited_log import RateLimitedLogger
+from services.telemetry_series import NumericSeries, is_numeric
 
 logger = logging.getLogger(__name__)
+# For drops on full client queues, which happen once per message while a client lags
+drop_logger = RateLimitedLogger(logger)
+# For rejected incoming messages, which a misbehaving client can send in a flood
+message_logger = RateLimitedLogger(logger)
 
 
 class WebSocketManager:
@@ -18,29 +28,111 @@ class WebSocketManager:
     """
     
     def __init__(self):
-        # Active WebSocket connections
-        self.active_connections: List[WebSocket] = []
+        # Active WebSocket connections, a set so that disconnects don't scan every client
+        self.active_connections: Set[WebSocket] = set()
         
-        # In-memory log of all messages for historical data
-        self.message_history: List[GenericMessage] = []
+        # Outgoing message queue and writer task for each connection
+        self._client_queues: Dict[WebSocket, asyncio.Queue] = {}
+        self._client_writers: Dict[WebSocket, asyncio.Task] = {}
+        
+        # Maximum number of queued messages per client, and per outgoing frame
+        self.client_queue_size = int(os.getenv("CLIENT_QUEUE_SIZE", "256"))
+        self.max_batch_size = int(os.getenv("MAX_BATCH_SIZE", "32"))
+        
+        # Seconds a writer waits for more messages before sending, while messages arrive in bursts
+        self.batch_linger = float(os.getenv("BATCH_LINGER", "0.001"))
+        
+        # Seconds a single send may take before the client is considered stalled
+        self.send_timeout = float(os.getenv("SEND_TIMEOUT", "5.0"))
+        
+        # Handlers for incoming messages, keyed by their "type" discriminator
+        self._message_handlers: Dict[str, Callable[[WebSocket, CommandMessage], Awaitable[CommandMessage]]] = {
+            "command": self._on_command,
+        }
+        
+        # Validates incoming commands (id, parameters) -> (is_valid, error_message).
+        # Set by the configuration manager, which imports this module and so can't be imported here
+        self.command_validator: Optional[Callable[[str, Dict[str, Any]], Tuple[bool, Optional[str]]]] = None
         
         # Maximum number of messages to keep in history
         self.max_history_size = int(os.getenv("MAX_HISTORY_SIZE", "10000"))
         
+        # In-memory log of all messages for historical data, indexed by timestamp
+        self.message_history = MessageHistory(self.max_history_size)
+        
+        # Columnar copies of numeric telemetry streams, keyed by telemetry id
+        self.numeric_series: Dict[str, NumericSeries] = {}
+        
     async def connect(self, websocket: WebSocket) -> None:
         """Accept a new WebSocket connection."""
         await websocket.accept()
-        self.active_connections.append(websocket)
+        self.active_connections.add(websocket)
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.client_queue_size)
+        self._client_queues[websocket] = queue
+        self._client_writers[websocket] = asyncio.create_task(self._writer(websocket, queue))
         logger.info(f"New WebSocket connection. Total connections: {len(self.active_connections)}")
         
     def disconnect(self, websocket: WebSocket) -> None:
         """Remove a WebSocket connection."""
+        self._client_queues.pop(websocket, None)
+        writer = self._client_writers.pop(websocket, None)
+        if writer is not None:
+            writer.cancel()
         if websocket in self.active_connections:
             self.active_connections.remove(websocket)
             logger.info(f"WebSocket connection closed. Total connections: {len(self.active_connections)}")
     
+    async def _writer(self, websocket: WebSocket, queue: asyncio.Queue) -> None:
+        """
+        Send queued messages to a single client.
+        Everything already queued when the writer wakes up (up to max_batch_size)
+        goes out in one frame as a JSON array, so a slow client only delays itself.
+        While messages arrive in bursts (the last frame was a batch), the writer lingers
+        for batch_linger seconds first so the rest of the burst joins the frame;
+        a lone message is still sent right away.
+        A send that takes longer than send_timeout disconnects the client.
+        """
+        bursting = False
+        try:
+            while True:
+                batch = [await queue.get()]
+                if bursting and self.batch_linger > 0 and queue.qsize() < self.max_batch_size - 1:
+                    await asyncio.sleep(self.batch_linger)
+                while len(batch) < self.max_batch_size and not queue.empty():
+                    batch.append(queue.get_nowait())
+                bursting = len(batch) > 1
+                
+                payload = batch[0] if len(batch) == 1 else b"[" + b",".join(batch) + b"]"
+                async with asyncio.timeout(self.send_timeout):
+                    await websocket.send_bytes(payload)
+        except asyncio.CancelledError:
+            raise
+        except TimeoutError:
+            logger.warning(f"Send to connection timed out after {self.send_timeout}s, disconnecting client")
+            await self._abort(websocket)
+        except Exception as e:
+            logger.error(f"Error broadcasting to connection: {e}")
+            await self._abort(websocket)
+    
+    async def _abort(self, websocket: WebSocket) -> None:
+        """
+        Disconnect a client whose writer failed, then close its socket so that its receive loop ends too.
+        Called from the client's own writer, which is ending anyway and so is not cancelled.
+        The close is bounded by send_timeout, a stalled client may never acknowledge it.
+        """
+        self._client_writers.pop(websocket, None)
+        self.disconnect(websocket)
+        try:
+            async with asyncio.timeout(self.send_timeout):
+                await websocket.close(code=status.WS_1011_INTERNAL_ERROR)
+        except Exception as e:
+            logger.debug(f"Error closing connection: {e}")
+    
     async def send_personal_message(self, message: str, websocket: WebSocket) -> None:
         """Send a message to a specific WebSocket connection."""
+        if websocket not in self.active_connections:
+            # Already disconnected (e.g. its writer failed mid-frame), nothing more may be written to it
+            return
         try:
             await websocket.send_text(message)
         except Exception as e:
@@ -50,85 +142,171 @@ class WebSocketManager:
     async def broadcast_message(self, message: GenericMessage) -> None:
         """
         Broadcast a telemetry message to all connected clients.
+        The message is serialized once and queued for each client without waiting on any socket.
         Also stores the message in history for historical data queries.
         """
-        # Convert message to JSON
-        message_json = message.model_dump_json()
-        
-        # Store in history
-        self._add_to_history(message)
-        
-        # Broadcast to all connected clients
-        if self.active_connections:
-            disconnected = []
-            for connection in self.active_connections:
-                try:
-                    await connection.send_text(message_json)
-                except Exception as e:
-                    logger.error(f"Error broadcasting to connection: {e}")
-                    disconnected.append(connection)
-            
-            # Clean up disconnected clients
-            for connection in disconnected:
-                self.disconnect(connection)
+        # Encode once; every client receives the same bytes
+        payload = encode_message(message)
+        
+        # Store in history, along with its encoding for /historical-data
+        self._add_to_history(message, payload)
+        
+        await self.broadcast(payload)
+    
+    async def broadcast_messages(self, messages: List[GenericMessage]) -> None:
+        """
+        Broadcast several messages at once (e.g. one simulator tick).
+        They are queued for each client in a single pass, so each writer sends them
+        together as one JSON array frame instead of one frame per message.
+        Also stores the messages in history for historical data queries.
+        """
+        payloads = []
+        for message in messages:
+            payload = encode_message(message)
+            self._add_to_history(message, payload)
+            payloads.append(payload)
+        
+        self._enqueue(payloads)
     
-    async def handle_incoming_message(self, websocket: WebSocket, message_data: str) -> CommandMessage:
+    async def broadcast(self, payload: bytes) -> None:
+        """
+        Queue an already serialized JSON payload for every connected client.
+        Payloads sent this way are not recorded in the message history.
+        """
+        self._enqueue((payload,))
+    
+    def _enqueue(self, payloads: Sequence[bytes]) -> None:
+        """Queue serialized payloads for every connected client, without waiting on any socket."""
+        # The writer tasks do the actual sends
+        for connection in self.active_connections:
+            queue = self._client_queues.get(connection)
+            if queue is None:
+                continue
+            for payload in payloads:
+                if queue.full():
+                    # Drop-oldest: a lagging client skips ahead instead of falling further behind
+                    queue.get_nowait()
+                    drop_logger.warning("Client send queue is full, dropping oldest message")
+                queue.put_nowait(payload)
+    
+    async def handle_incoming_message(self, websocket: WebSocket, message_data: Union[str, bytes]) -> CommandMessage:
         """
         Handle incoming message from a WebSocket client.
         Validates and parses command messages.
+        Accepts both text and binary frames, which pydantic-core parses and validates in a single pass.
         """
         try:
-            # Parse JSON message
-            data = json.loads(message_data)
-            data['type'] = 'command'  # Set message type
+            # Parse and validate JSON message against the discriminated union
+            try:
+                message = GenericMessage.model_validate_json(message_data).root
+            except ValidationError as e:
+                if e.errors()[0]["type"] != "union_tag_not_found":
+                    raise
+                # Frames without a type are commands, as clients sent them before messages were typed
+                message = CommandMessage.model_validate_json(message_data)
             
-            # Create CommandMessage object
-            command_message = CommandMessage(**data)
+            handler = self._message_handlers.get(message.type)
+            if handler is None:
+                raise ValueError(f"Unsupported message type '{message.type}'")
             
-            # Validate command against registered templates
-            from services.configuration_manager import config_manager
-            is_valid, error_msg = config_manager.validate_command(
-                command_message.command, 
-                command_message.parameters
-            )
-            
-            if not is_valid:
-                logger.warning(f"Invalid command received: {error_msg}")
-                await self.send_personal_message(
-                    json.dumps({"error": f"Command validation failed: {error_msg}"}), 
-                    websocket
-                )
-                raise ValueError(f"Command validation failed: {error_msg}")
-            
-            logger.info(f"Received valid command: {command_message.command} with parameters: {command_message.parameters}")
+            return await handler(websocket, message)
             
-            return command_message
-            
-        except json.JSONDecodeError as e:
-            logger.error(f"Invalid JSON in WebSocket message: {e}")
-            await self.send_personal_message(
-                json.dumps({"error": "Invalid JSON format"}), 
-                websocket
-            )
+        except ValidationError as e:
+            if e.errors()[0]["type"] == "json_invalid":
+                message_logger.error("Invalid JSON in WebSocket message: %s", e)
+                error = "Invalid JSON format"
+            else:
+                message_logger.error("Invalid WebSocket message: %s", e)
+                error = f"Message parsing error: {str(e)}"
+            await self.send_personal_message(json.dumps({"error": error}), websocket)
             raise
         except Exception as e:
-            logger.error(f"Error parsing WebSocket message: {e}")
+            message_logger.error("Error parsing WebSocket message: %s", e)
             await self.send_personal_message(
                 json.dumps({"error": f"Message parsing error: {str(e)}"}), 
                 websocket
             )
             raise
     
-    def _add_to_history(self, message: GenericMessage) -> None:
-        """Add a message to the history log, maintaining size limit."""
-        self.message_history.append(message)
+    async def _on_command(self, websocket: WebSocket, command_message: CommandMessage) -> CommandMessage:
+        """Validate a command message against the registered command templates."""
+        if self.command_validator is None:
+            is_valid, error_msg = False, "No command templates available"
+        else:
+            is_valid, error_msg = self.command_validator(
+                command_message.command, 
+                command_message.parameters
+            )
+        
+        if not is_valid:
+            message_logger.warning("Invalid command received: %s", error_msg)
+            await self.send_personal_message(
+                json.dumps({"error": f"Command validation failed: {error_msg}"}), 
+                websocket
+            )
+            raise ValueError(f"Command validation failed: {error_msg}")
+        
+        logger.info(f"Received valid command: {command_message.command} with parameters: {command_message.parameters}")
+        
+        return command_message
+    
+    def _add_to_history(self, message: GenericMessage, payload: Optional[bytes] = None) -> None:
+        """Add a message (and its JSON encoding, if already known) to the history log, maintaining size limit."""
+        self.message_history.append(message, payload)
+        
+        root = message.root
+        if root.type == "data":
+            series = self.numeric_series.get(root.id)
+            if series is not None:
+                series.append(timestamp_key(root.timestamp), root.value)
+    
+    def register_numeric_series(self, telemetry_types: Dict[str, TelemetryTypeConfig]) -> None:
+        """
+        Keep a NumericSeries for every int/float telemetry type in the configuration.
+        Series of types that are still present with the same data type and storage keep their samples.
+        """
+        series: Dict[str, NumericSeries] = {}
+        for telemetry_id, config in telemetry_types.items():
+            if not is_numeric(config.data_type):
+                continue
+            existing = self.numeric_series.get(telemetry_id)
+            if existing is not None and existing.layout == NumericSeries.layout_for(config):
+                series[telemetry_id] = existing
+            else:
+                series[telemetry_id] = NumericSeries(config, self.max_history_size)
+        self.numeric_series = series
+    
+    def _query_history(self, query: Optional[HistoricalDataQuery]) -> List[HistoryEntry]:
+        """Select the history entries matching the query filters."""
+        if query is None:
+            return self.message_history.entries()
+        limit = query.limit or None
+        
+        if query.from_timestamp or query.to_timestamp:
+            # Narrow to the time window first, using the timestamp index
+            entries = self.message_history.between(query.from_timestamp, query.to_timestamp)
+            if query.type or query.id:
+                # Filter in a single pass from the newest entry back, stopping once the limit is reached
+                # (the id filter only matches message types that have an id field)
+                matches = (
+                    entry for entry in reversed(entries)
+                    if (not query.type or entry.message.root.type == query.type)
+                    and (not query.id or getattr(entry.message.root, 'id', None) == query.id)
+                )
+                entries = list(islice(matches, limit))
+                entries.reverse()
+                return entries
+        elif query.type or query.id:
+            # Only the matching entries are visited, using the type and id indexes
+            return self.message_history.matching(query.type, query.id, limit)
+        elif limit:
+            # Only the tail of the log is needed, read it straight from the ring buffer
+            return self.message_history.latest(limit)
+        else:
+            return self.message_history.entries()
 
-        # Maintain history size limit
-        if len(self.message_history) > self.max_history_size:
-            # Remove oldest messages (FIFO), for now
-            # (TODO) Implement storing in different files, to not lose data (except otherwise specified)
-            excess = len(self.message_history) - self.max_history_size
-            self.message_history = self.message_history[excess:]
+        # Apply limit (take most recent messages)
+        return entries[-limit:] if limit else entries
     
     def get_historical_data(self, 
                           query: Optional[HistoricalDataQuery] = None) -> HistoricalDataResponse:
@@ -140,49 +318,70 @@ class WebSocketManager:
         Returns:
             HistoricalDataResponse containing filtered messages
         """
-        filtered_messages = self.message_history.copy()
-        
-        # Apply filters
-        if query:
-            if query.type:
-                filtered_messages = [msg for msg in filtered_messages if msg.root.type == query.type]
-            if query.id:
-                # Only filter by id if the message type has an id field
-                filtered_messages = [
-                    msg for msg in filtered_messages 
-                    if hasattr(msg.root, 'id') and getattr(msg.root, 'id', None) == query.id
-                ]
-            if query.from_timestamp:
-                from_dt = datetime.fromisoformat(query.from_timestamp.replace('Z', '+00:00'))
-                filtered_messages = [
-                    msg for msg in filtered_messages
-                    if msg.root.timestamp > from_dt
-                ]
-            if query.to_timestamp:
-                to_dt = datetime.fromisoformat(query.to_timestamp.replace('Z', '+00:00'))
-                filtered_messages = [
-                    msg for msg in filtered_messages 
-                    if msg.root.timestamp < to_dt
-                ]
-
-        # Apply limit (take most recent messages)
-        if query and query.limit:
-            filtered_messages = filtered_messages[-query.limit:]
+        entries = self._query_history(query)
 
         return HistoricalDataResponse(
-            data=filtered_messages,
+            data=[entry.message for entry in entries],
             total_records=len(self.message_history),
-            filtered_records=len(filtered_messages)
+            filtered_records=len(entries)
+        )
+    
+    def get_historical_data_json(self, 
+                               query: Optional[HistoricalDataQuery] = None) -> bytes:
+        """
+        Retrieve historical messages with optional filtering, already serialized.
+        Builds the HistoricalDataResponse JSON from the stored encoding of each message,
+        so no message is serialized again.
+        
+        Args:
+            query: HistoricalDataQuery object with optional filters
+        Returns:
+            JSON encoded HistoricalDataResponse containing filtered messages
+        """
+        entries = self._query_history(query)
+
+        return (
+            b'{"data":[' + b",".join(entry.payload for entry in entries) + b'],'
+            b'"total_records":%d,"filtered_records":%d}' % (len(self.message_history), len(entries))
         )
     
     def get_connection_count(self) -> int:
         """Get the number of active WebSocket connections."""
         return len(self.active_connections)
     
+    def get_series_json(self, query: HistoricalDataQuery) -> Optional[bytes]:
+        """
+        Retrieve the samples of a numeric telemetry stream as columns.
+        Uses query.id and the since/until window; query.limit keeps the most recent samples.
+        
+        Args:
+            query: HistoricalDataQuery object, with the id of a numeric telemetry type
+        Returns:
+            JSON object with the id, timestamps (epoch milliseconds) and values arrays,
+            or None if there is no numeric series for that id
+        """
+        series = self.numeric_series.get(query.id) if query.id else None
+        if series is None:
+            return None
+        
+        timestamps, values = series.window(
+            timestamp_key(query.from_timestamp) if query.from_timestamp else None,
+            timestamp_key(query.to_timestamp) if query.to_timestamp else None
+        )
+        if query.limit:
+            timestamps, values = timestamps[-query.limit:], values[-query.limit:]
+        
+        return orjson.dumps(
+            {"id": query.id, "timestamps": timestamps / 1000, "values": values},
+            option=orjson.OPT_SERIALIZE_NUMPY
+        )
+    
     def clear_history(self) -> int:
         """Clear all historical data. Returns number of messages cleared."""
         cleared_count = len(self.message_history)
         self.message_history.clear()
+        for series in self.numeric_series.values():
+            series.clear()
         logger.info(f"Cleared {cleared_count} messages from history")
         return cleared_count
 
@@ -18,9 +18,9 @@ def event_loop():
     loop.close()
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def client():
-    """Create a test client for the FastAPI app."""
+    """Create a test client for the FastAPI app, shared by the whole session (it holds no per-test state)."""
     return TestClient(app)
 
 
@@ -38,12 +38,14 @@ async def app_lifecycle():
 def reset_services():
     """Reset services to clean state before each test."""
     # Clear any existing connections and data
-    websocket_manager.active_connections.clear()
-    websocket_manager.message_history.clear()
-    config_manager.telemetry_types.clear()
-    config_manager.command_templates.clear()
-    config_manager.device_connected = False
+    for connection in list(websocket_manager.active_connections):
+        websocket_manager.disconnect(connection)
+    websocket_manager.clear_history()
+    # Clears the configuration along with everything derived from it (compiled validators, numeric series)
+    config_manager.unregister_device("tests")
     yield
-    # Cleanup after test
-    websocket_manager.active_connections.clear()
-    websocket_manager.message_history.clear()
+    # Cleanup after test, so no configuration leaks into tests that don't use this fixture's setup
+    for connection in list(websocket_manager.active_connections):
+        websocket_manager.disconnect(connection)
+    websocket_manager.clear_history()
+    config_manager.unregister_device("tests")
@@ -0,0 +1,34 @@
+"""
+Test the cached message clock.
+"""
+import time
+from datetime import datetime
+
+from models import clock
+from models.clock import current_dt
+from models.telemetry import CommandResultMessage
+from models.commands import CommandResult, CommandStatus
+
+
+class TestClock:
+    """Test the current_dt cached clock."""
+
+    def test_reuses_timestamp_within_resolution(self, monkeypatch):
+        """Test that calls within the resolution window share a datetime."""
+        monkeypatch.setattr(clock, "CLOCK_RESOLUTION_NS", 10**12)
+        first = current_dt()
+        assert current_dt() is first
+
+    def test_refreshes_after_resolution(self, monkeypatch):
+        """Test that the clock follows the wall clock once the window has passed."""
+        monkeypatch.setattr(clock, "CLOCK_RESOLUTION_NS", 0)
+        before = datetime.now()
+        time.sleep(0.001)
+        assert current_dt() > before
+
+    def test_default_message_timestamp(self):
+        """Test that messages without an explicit timestamp get the current time."""
+        message = CommandResultMessage(
+            value=CommandResult(command="start", status=CommandStatus.SUCCESS, message="ok")
+        )
+        assert abs((datetime.now() - message.timestamp).total_seconds()) < 1
@@ -67,6 +67,22 @@ class TestConfigurationManager:
         assert "test_command" in config_manager.command_templates
         assert config_manager.device_connected == True
     
+    def test_register_rejects_int16_storage_without_range(self):
+        """Test that int16 storage needs a range to quantize over."""
+        result = config_manager.register_device_configuration(
+            telemetry_types={
+                "pressure": {
+                    "data_type": "float",
+                    "storage_dtype": "int16",
+                    "description": "Pressure sensor"
+                }
+            },
+            command_templates={},
+            device_id="test_device"
+        )
+        
+        assert result == False
+    
     def test_get_telemetry_types(self):
         """Test retrieving telemetry types."""
         # Add test data directly
@@ -79,8 +95,8 @@ class TestConfigurationManager:
         
         response = config_manager.get_telemetry_types()
         
-        assert hasattr(response, 'telemetry_types')
-        assert hasattr(response, 'last_updated')
+        assert isinstance(response.telemetry_types, dict)
+        assert isinstance(response.last_updated, str)
         assert "test_sensor" in response.telemetry_types
         assert response.telemetry_types["test_sensor"].unit == "V"
     
@@ -101,8 +117,8 @@ class TestConfigurationManager:
         
         response = config_manager.get_command_templates()
         
-        assert hasattr(response, 'command_templates')
-        assert hasattr(response, 'last_updated')
+        assert isinstance(response.command_templates, dict)
+        assert isinstance(response.last_updated, str)
         assert "test_cmd" in response.command_templates
         assert response.command_templates["test_cmd"].command == "test_cmd"
     
@@ -193,10 +209,81 @@ class TestConfigurationManager:
         assert is_valid == False
         assert error is not None and "must be one of" in error
     
+    def test_validate_telemetry_value_after_type_replaced(self):
+        """Test that replacing a telemetry type also replaces its compiled validator."""
+        config_manager.telemetry_types["level_sensor"] = TelemetryTypeConfig(
+            data_type=DataType.INT,
+            range={"min": 0, "max": 10},
+            description="Level sensor"
+        )
+        assert config_manager.validate_telemetry_value("level_sensor", 20) == (
+            False, "Value must be less than or equal to 10"
+        )
+
+        config_manager.telemetry_types["level_sensor"] = TelemetryTypeConfig(
+            data_type=DataType.INT,
+            range={"min": 0, "max": 100},
+            description="Level sensor"
+        )
+        assert config_manager.validate_telemetry_value("level_sensor", 20) == (True, None)
+        assert config_manager.validate_telemetry_value("level_sensor", 2.5) == (False, "Value must be an int")
+
+    def test_validate_telemetry_value_untyped_enum(self):
+        """Test enum and range checks on a data type without a type check."""
+        config_manager.telemetry_types["mode_sensor"] = TelemetryTypeConfig(
+            data_type=DataType.OBJECT,
+            enum=[1, 2, 3],
+            range={"min": 2},
+            description="Mode sensor"
+        )
+
+        assert config_manager.validate_telemetry_value("mode_sensor", 2) == (True, None)
+        assert config_manager.validate_telemetry_value("mode_sensor", 1) == (False, "Value must be greater than or equal to 2")
+        assert config_manager.validate_telemetry_value("mode_sensor", 4) == (False, "Value must be one of [1, 2, 3]")
+        assert config_manager.validate_telemetry_value("mode_sensor", {"mode": 2}) == (False, "Value must be one of [1, 2, 3]")
+
     def test_validate_telemetry_value_unknown_type(self):
         """Test telemetry value validation for unknown telemetry type."""
         assert config_manager.validate_telemetry_value("unknown_sensor", 42) == (False, "Unknown telemetry type")
 
+    def test_validate_command(self):
+        """Test command parameter validation against its template."""
+        config_manager.command_templates["set_mode"] = CommandTemplate(
+            command="set_mode",
+            parameters={
+                "mode": CommandParameter(
+                    type="string",
+                    required=True,
+                    enum=["auto", "manual"],
+                    description="Operating mode"
+                ),
+                "level": CommandParameter(
+                    type="int",
+                    required=False,
+                    description="Optional level"
+                )
+            },
+            description="Set operating mode"
+        )
+        
+        assert config_manager.validate_command("set_mode", {"mode": "auto"}) == (True, None)
+        assert config_manager.validate_command("set_mode", {"mode": "manual", "level": 3}) == (True, None)
+        
+        is_valid, error = config_manager.validate_command("set_mode", {})
+        assert is_valid == False and "is missing" in error
+        
+        is_valid, error = config_manager.validate_command("set_mode", {"mode": "auto", "speed": 1})
+        assert is_valid == False and "Unknown parameter" in error
+        
+        is_valid, error = config_manager.validate_command("set_mode", {"mode": "auto", "level": "high"})
+        assert is_valid == False and "invalid type" in error
+        
+        is_valid, error = config_manager.validate_command("set_mode", {"mode": "off"})
+        assert is_valid == False and "not in allowed values" in error
+        
+        is_valid, error = config_manager.validate_command("unknown_cmd", {})
+        assert is_valid == False and "not found" in error
+
     def test_is_configuration_available(self):
         """Test checking if configuration is available."""
         # Initially no configuration
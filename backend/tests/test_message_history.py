@@ -0,0 +1,113 @@
+"""
+Test the message history log, including eviction and timestamp-indexed queries.
+"""
+from datetime import datetime, timedelta
+
+import pytest
+
+from services.message_history import MessageHistory
+from models.commands import CommandResult, CommandStatus
+from models.telemetry import TelemetryMessage, CommandResultMessage, GenericMessage
+
+
+def make_message(sensor_id: str, timestamp: datetime) -> GenericMessage:
+    return GenericMessage(TelemetryMessage(id=sensor_id, value=1.0, timestamp=timestamp))
+
+
+class TestMessageHistory:
+    """Test the MessageHistory storage."""
+
+    def test_append_keeps_arrival_order(self):
+        """Test that iteration follows arrival order, not timestamp order."""
+        now = datetime.now()
+        history = MessageHistory(max_size=10)
+        history.append(make_message("late", now + timedelta(seconds=5)))
+        history.append(make_message("early", now))
+
+        assert len(history) == 2
+        assert [msg.root.id for msg in history] == ["late", "early"]
+
+    def test_rejects_non_positive_size(self):
+        """Test that a history without room for a single message is rejected up front."""
+        for max_size in (0, -1):
+            with pytest.raises(ValueError):
+                MessageHistory(max_size=max_size)
+
+    def test_evicts_oldest_when_full(self):
+        """Test that the oldest messages are evicted from the log and the time index."""
+        now = datetime.now()
+        history = MessageHistory(max_size=3)
+        for i in range(5):
+            history.append(make_message(f"sensor{i}", now + timedelta(seconds=i)))
+
+        assert len(history) == 3
+        assert [msg.root.id for msg in history] == ["sensor2", "sensor3", "sensor4"]
+        assert [entry.message.root.id for entry in history.between()] == ["sensor2", "sensor3", "sensor4"]
+
+    def test_latest_after_wraparound(self):
+        """Test reading the most recent entries once the ring buffer has wrapped."""
+        now = datetime.now()
+        history = MessageHistory(max_size=3)
+        for i in range(7):
+            history.append(make_message(f"sensor{i}", now))
+
+        assert [entry.message.root.id for entry in history.latest(2)] == ["sensor5", "sensor6"]
+        assert [entry.message.root.id for entry in history.latest(10)] == ["sensor4", "sensor5", "sensor6"]
+
+    def test_between_uses_exclusive_bounds(self):
+        """Test time window queries on out-of-order messages."""
+        now = datetime.now()
+        history = MessageHistory(max_size=10)
+        history.append(make_message("now", now))
+        history.append(make_message("after", now + timedelta(minutes=2)))
+        history.append(make_message("before", now - timedelta(minutes=2)))
+        history.append(make_message("end", now + timedelta(minutes=1)))
+
+        window = history.between(now - timedelta(minutes=1), now + timedelta(minutes=1))
+        assert [entry.message.root.id for entry in window] == ["now"]
+
+        assert [entry.message.root.id for entry in history.between(since=now)] == ["end", "after"]
+        assert [entry.message.root.id for entry in history.between(until=now)] == ["before"]
+
+    def test_matching_by_type_and_id(self):
+        """Test type and id filtered reads, including after the oldest entries are evicted."""
+        now = datetime.now()
+        result = CommandResult(command="get_status", status=CommandStatus.SUCCESS, message="ok")
+        history = MessageHistory(max_size=4)
+        history.append(make_message("temperature", now))
+        history.append(make_message("pressure", now))
+        history.append(GenericMessage(CommandResultMessage(value=result)))
+        history.append(make_message("temperature", now + timedelta(seconds=1)))
+        history.append(make_message("temperature", now + timedelta(seconds=2)))
+
+        assert [entry.message.root.id for entry in history.matching(message_type="data")] == [
+            "pressure", "temperature", "temperature"
+        ]
+        assert len(history.matching(message_id="temperature")) == 2
+        assert len(history.matching("command_result", "command_result")) == 1
+        assert history.matching("data", "command_result") == []
+        assert len(history.matching()) == 4
+        assert [entry.message.root.timestamp for entry in history.matching("data", "temperature", limit=1)] == [
+            now + timedelta(seconds=2)
+        ]
+
+    def test_stores_message_encoding(self):
+        """Test that entries keep the given payload, or encode the message when none is given."""
+        history = MessageHistory(max_size=10)
+        message = make_message("sensor", datetime.now())
+        history.append(message, b"cached")
+        history.append(message)
+
+        first, second = history.entries()
+        assert first.payload == b"cached"
+        assert second.payload == message.model_dump_json().encode("utf-8")
+
+    def test_clear(self):
+        """Test clearing the log and its index."""
+        history = MessageHistory(max_size=10)
+        history.append(make_message("sensor", datetime.now()))
+        history.clear()
+
+        assert len(history) == 0
+        assert history.between() == []
+        assert history.matching(message_type="data") == []
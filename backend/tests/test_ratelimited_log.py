@@ -0,0 +1,37 @@
+"""
+Test the rate limited logger used on hot paths.
+"""
+import logging
+
+from services.ratelimited_log import RateLimitedLogger
+
+
+class TestRateLimitedLogger:
+    """Test the RateLimitedLogger token bucket."""
+
+    def test_suppresses_bursts(self, caplog):
+        """Test that records over the rate are dropped and counted on the next record."""
+        rl_logger = RateLimitedLogger(logging.getLogger("test.ratelimited"), rate=2, per=60.0)
+
+        with caplog.at_level(logging.ERROR, logger="test.ratelimited"):
+            for i in range(5):
+                rl_logger.error("Error %d", i)
+
+        assert [record.getMessage() for record in caplog.records] == ["Error 0", "Error 1"]
+
+        # Refill the bucket as if the period had passed
+        rl_logger._last_refill -= 60.0
+        with caplog.at_level(logging.ERROR, logger="test.ratelimited"):
+            rl_logger.error("Error %d", 5)
+
+        assert caplog.records[-1].getMessage() == "Error 5 (3 similar messages suppressed)"
+
+    def test_disabled_level_does_not_take_tokens(self, caplog):
+        """Test that records below the logger level are skipped before the rate limit."""
+        rl_logger = RateLimitedLogger(logging.getLogger("test.ratelimited.level"), rate=1, per=60.0)
+
+        with caplog.at_level(logging.WARNING, logger="test.ratelimited.level"):
+            rl_logger.info("Skipped")
+            rl_logger.warning("Logged")
+
+        assert [record.getMessage() for record in caplog.records] == ["Logged"]
@@ -3,9 +3,13 @@ Test simulator functionality including data generation, command handling, and co
 """
 import pytest
 import asyncio
-from datetime import datetime
+import json
+import time
+from unittest.mock import patch
 
-from services.simulator import simulator
+import numpy as np
+
+from services.simulator import simulator, advance_numeric
 from services.configuration_manager import config_manager
 from services.websocket_manager import websocket_manager
 from models.commands import Command
@@ -76,7 +80,6 @@ class TestSimulator:
         
         async def mock_broadcast(message):
             captured_messages.append(message)
-            return await original_broadcast(message)
         
         websocket_manager.broadcast_message = mock_broadcast
         
@@ -110,37 +113,28 @@ class TestSimulator:
         captured_messages = []
         original_broadcast = websocket_manager.broadcast_message
         
+        completed = asyncio.Event()
+        
         async def mock_broadcast(message):
             captured_messages.append(message)
-            return await original_broadcast(message)
+            if message.root.type == "command_result" and message.root.value.status == "success":
+                completed.set()
         
         websocket_manager.broadcast_message = mock_broadcast
         
         try:
             # Handle command
-            start_time = datetime.now()
+            start_time = time.monotonic()
             await simulator.handle_command(command)
             
             # Wait for the success message to arrive (calibration should complete in ~1 second)
-            # We'll wait up to 3 seconds for the completion message
-            max_wait_time = 3.0
-            wait_start = datetime.now()
-            
-            while (datetime.now() - wait_start).total_seconds() < max_wait_time:
-                if len(captured_messages) >= 2:
-                    # Check if we have a success message
-                    success_messages = [msg for msg in captured_messages 
-                                      if msg.root.type == "command_result" and msg.root.value.status == "success"]
-                    if success_messages:
-                        end_time = datetime.now()
-                        break
-                await asyncio.sleep(0.1)  # Check every 100ms
-            else:
-                # Timeout waiting for success message
+            try:
+                await asyncio.wait_for(completed.wait(), timeout=3.0)
+            except TimeoutError:
                 assert False, f"Timeout waiting for calibration completion. Messages: {len(captured_messages)}"
             
             # Should have taken approximately 1 second from start to success message
-            duration = (end_time - start_time).total_seconds()
+            duration = time.monotonic() - start_time
             assert 0.8 <= duration <= 1.5  # Allow some tolerance
             
             # Should have sent multiple progress updates + completion
@@ -171,7 +165,6 @@ class TestSimulator:
         
         async def mock_broadcast(message):
             captured_messages.append(message)
-            return await original_broadcast(message)
         
         websocket_manager.broadcast_message = mock_broadcast
         
@@ -197,15 +190,14 @@ class TestSimulator:
         original_interval = simulator.update_interval
         simulator.update_interval = 0.1  # 100ms
         
-        # Mock websocket manager to capture messages
-        captured_messages = []
-        original_broadcast = websocket_manager.broadcast_message
+        # Mock websocket manager to capture telemetry batches
+        captured_batches = []
+        original_broadcast = websocket_manager.broadcast_messages
         
-        async def mock_broadcast(message):
-            captured_messages.append(message)
-            return await original_broadcast(message)
+        async def mock_broadcast(messages):
+            captured_batches.append(messages)
         
-        websocket_manager.broadcast_message = mock_broadcast
+        websocket_manager.broadcast_messages = mock_broadcast
         
         try:
             # Start simulator for a short period
@@ -214,16 +206,64 @@ class TestSimulator:
             await simulator.stop()
             
             # Should have generated telemetry data
-            assert len(captured_messages) > 0
+            assert len(captured_batches) > 0
             
-            # Check that we have telemetry messages
-            telemetry_messages = [msg for msg in captured_messages if msg.root.type == "data"]
-            assert len(telemetry_messages) > 0
+            # Each tick carries one telemetry message per sensor
+            for batch in captured_batches:
+                assert [msg.root.id for msg in batch] == list(simulator.sensors)
+                assert all(msg.root.type == "data" for msg in batch)
             
         finally:
-            websocket_manager.broadcast_message = original_broadcast
+            websocket_manager.broadcast_messages = original_broadcast
+            simulator.update_interval = original_interval
+
+    @pytest.mark.asyncio
+    async def test_first_tick_reaches_numeric_series(self):
+        """Test that the configuration is registered before the first tick, so its values land in the series."""
+        original_interval = simulator.update_interval
+        simulator.update_interval = 60.0
+        first_tick = asyncio.Event()
+        original_broadcast = websocket_manager.broadcast_messages
+        
+        async def broadcast(messages):
+            await original_broadcast(messages)
+            first_tick.set()
+        
+        try:
+            with patch.object(websocket_manager, "broadcast_messages", broadcast):
+                await simulator.start()
+                await asyncio.wait_for(first_tick.wait(), timeout=1.0)
+                
+                for sensor_id in simulator._num_ids:
+                    assert len(websocket_manager.numeric_series[sensor_id]) == 1
+                await simulator.stop()
+        finally:
             simulator.update_interval = original_interval
     
+    @pytest.mark.asyncio
+    async def test_tick_cadence_includes_broadcast_time(self):
+        """Test that slow broadcasts don't stretch the interval between ticks."""
+        original_interval = simulator.update_interval
+        simulator.update_interval = 0.1
+        loop = asyncio.get_running_loop()
+        tick_times = []
+
+        async def slow_broadcast(messages):
+            tick_times.append(loop.time())
+            await asyncio.sleep(0.05)
+
+        try:
+            with patch.object(websocket_manager, "broadcast_messages", slow_broadcast):
+                await simulator.start()
+                await asyncio.sleep(0.35)
+                await simulator.stop()
+
+            assert len(tick_times) >= 3
+            gaps = [later - earlier for earlier, later in zip(tick_times, tick_times[1:])]
+            assert all(gap < 0.13 for gap in gaps)
+        finally:
+            simulator.update_interval = original_interval
+
     def test_sensor_initial_values(self):
         """Test that sensor values are initialized within expected ranges."""
         # Check initial sensor values
@@ -241,6 +281,84 @@ class TestSimulator:
         assert pressure_sensor["unit"] == "hPa"
         assert humidity_sensor["unit"] == "%"
     
+    def test_tick_stays_in_range(self):
+        """Test that ticks keep sensors within bounds and numeric values visible through the sensor views."""
+        original_value = simulator.sensors["pressure"]["value"]
+        try:
+            simulator.sensors["pressure"]["value"] = simulator.sensors["pressure"]["max"]
+            for _ in range(50):
+                values = simulator._tick()
+            
+            assert values["system_status"] in simulator.sensors["system_status"]["options"]
+            for sensor_id in simulator._num_ids:
+                sensor = simulator.sensors[sensor_id]
+                value = values[sensor_id]
+                assert sensor["min"] <= value <= sensor["max"]
+                assert abs(sensor["value"] - value) <= 0.005 + 1e-9
+        finally:
+            simulator.sensors["pressure"]["value"] = original_value
+    
+    def test_sensor_dicts_hold_values(self):
+        """Test that numeric sensor dicts keep "value" as a real key as ticks and writes change it."""
+        original_value = simulator.sensors["temperature"]["value"]
+        try:
+            simulator._tick()
+            for sensor_id, index in simulator._num_index.items():
+                sensor = simulator.sensors[sensor_id]
+                assert "value" in sensor
+                assert dict(sensor)["value"] == simulator._num_values[index]
+            
+            simulator.sensors["temperature"].update(value=21.5)
+            assert simulator._num_values[simulator._num_index["temperature"]] == 21.5
+            assert json.loads(json.dumps(simulator.sensors))["temperature"]["value"] == 21.5
+        finally:
+            simulator.sensors["temperature"]["value"] = original_value
+    
+    @pytest.mark.asyncio
+    async def test_execute_unknown_command(self):
+        """Test that commands without a handler get an error result."""
+        result = await simulator._execute_command(Command(command="self_destruct"))
+        
+        assert result.status == "error"
+        assert result.message == "Unknown command: self_destruct"
+
+    @pytest.mark.asyncio
+    async def test_set_sensor_value_validation(self):
+        """Test the set_sensor_value value checks for numeric and discrete sensors."""
+        original_value = simulator.sensors["humidity"]["value"]
+        try:
+            async def set_value(sensor_id, value):
+                order = Command(command="set_sensor_value", parameters={"sensor_id": sensor_id, "value": value})
+                return await simulator._execute_command(order)
+
+            result = await set_value("humidity", "55.5")
+            assert result.status == "success"
+            assert simulator.sensors["humidity"]["value"] == 55.5
+
+            assert (await set_value("humidity", 95)).message == "Value must be between 20.0 and 80.0"
+            assert (await set_value("humidity", "wet")).message == "Invalid numeric value"
+            assert (await set_value("system_status", "exploded")).message.startswith("Invalid value for system_status")
+            assert (await set_value("altitude", 1)).message == "Unknown sensor: altitude"
+        finally:
+            simulator.sensors["humidity"]["value"] = original_value
+
+    def test_advance_numeric(self):
+        """Test the drift, clamp and rounding of the numeric sensor kernel."""
+        values = np.array([10.0, 10.0, 10.0, 99.5])
+        out = np.empty(4)
+        
+        advance_numeric(
+            values,
+            mins=np.full(4, 0.0),
+            maxs=np.full(4, 100.0),
+            drifts=np.array([1.0, 1.0, 0.333, 1.0]),
+            draws=np.array([1.0, 0.0, 1.0, 1.0]),
+            out=out
+        )
+        
+        assert out.tolist() == [11.0, 9.0, 10.333, 100.0]
+        assert values.tolist() == [11.0, 9.0, 10.33, 100.0]
+    
     @pytest.mark.asyncio
     async def test_simulator_cleanup_on_stop(self):
         """Test that simulator properly cleans up when stopped."""
@@ -251,3 +369,36 @@ class TestSimulator:
         await simulator.stop()
         assert simulator.is_running == False
         assert simulator.simulation_task is None or simulator.simulation_task.cancelled()
+    
+    @pytest.mark.asyncio
+    async def test_stop_cancels_background_commands(self):
+        """Test that stopping the simulator cancels calibrations still in progress."""
+        await simulator.start()
+        await simulator.handle_command(Command(command="calibrate_sensors", parameters={"duration": 30.0}))
+        await asyncio.sleep(0)
+        
+        await simulator.stop()
+        
+        calibrations = [
+            task for task in asyncio.all_tasks()
+            if task.get_coro().__qualname__.endswith("_perform_calibration")
+        ]
+        assert calibrations == []
+        assert simulator._task_group is None
+    
+    @pytest.mark.asyncio
+    async def test_stop_wakes_simulation_loop(self):
+        """Test that stop() ends the loop right away instead of waiting out the update interval."""
+        original_interval = simulator.update_interval
+        simulator.update_interval = 60.0
+        try:
+            await simulator.start()
+            await asyncio.sleep(0.01)
+            loop_task = simulator._loop_task
+            
+            await asyncio.wait_for(simulator.stop(), timeout=1.0)
+            
+            assert loop_task.done()
+            assert not loop_task.cancelled()
+        finally:
+            simulator.update_interval = original_interval
@@ -0,0 +1,78 @@
+"""
+Test the columnar storage of numeric telemetry streams.
+"""
+import pytest
+
+from models.configuration import TelemetryTypeConfig
+from services.telemetry_series import NumericSeries
+
+
+def make_series(data_type: str, capacity: int, **config) -> NumericSeries:
+    return NumericSeries(TelemetryTypeConfig(data_type=data_type, description="Test sensor", **config), capacity)
+
+
+class TestNumericSeries:
+    """Test the NumericSeries ring buffer."""
+
+    def test_window_uses_exclusive_bounds(self):
+        """Test time window queries on in-order samples."""
+        series = make_series("float", capacity=10)
+        for i in range(5):
+            series.append(i * 1000, i * 1.5)
+
+        timestamps, values = series.window(1000, 4000)
+        assert timestamps.tolist() == [2000, 3000]
+        assert values.tolist() == [3.0, 4.5]
+
+    def test_wraparound_and_out_of_order(self):
+        """Test that overwritten samples are dropped and late samples are sorted into place."""
+        series = make_series("int", capacity=3)
+        for timestamp, value in [(10, 1), (20, 2), (40, 4), (30, 3)]:
+            series.append(timestamp, value)
+
+        assert len(series) == 3
+        timestamps, values = series.window()
+        assert timestamps.tolist() == [20, 30, 40]
+        assert values.tolist() == [2, 3, 4]
+
+    def test_rejects_non_positive_capacity(self):
+        """Test that a series without room for a single sample is rejected up front."""
+        with pytest.raises(ValueError):
+            make_series("float", capacity=0)
+
+    def test_rejects_mismatched_values(self):
+        """Test that values of the wrong type are not stored."""
+        series = make_series("int", capacity=3)
+
+        assert series.append(0, 1.5) is False
+        assert series.append(0, True) is False
+        assert series.append(0, 2) is True
+        assert len(series) == 1
+
+    def test_float32_storage(self):
+        """Test that float32 storage keeps values to single precision."""
+        series = make_series("float", capacity=3, storage_dtype="float32")
+        series.append(0, 22.123456789)
+
+        _, values = series.window()
+        assert values.dtype.name == "float32"
+        assert abs(float(values[0]) - 22.123456789) < 1e-5
+
+    def test_int16_storage_quantizes_range(self):
+        """Test that int16 storage round-trips within half a quantization step and clamps to the range."""
+        series = make_series("float", capacity=5, storage_dtype="int16", range={"min": 980.0, "max": 1050.0})
+        for timestamp, value in enumerate([980.0, 1013.25, 1024.37, 1050.0, 2000.0]):
+            series.append(timestamp, value)
+
+        _, values = series.window()
+        half_step = 70.0 / 65535 / 2
+        for decoded, expected in zip(values.tolist(), [980.0, 1013.25, 1024.37, 1050.0, 1050.0]):
+            assert abs(decoded - expected) <= half_step + 1e-9
+
+    def test_int16_storage_keeps_sub_hundredth_precision(self):
+        """Test that values with more decimals than a hundredth are not rounded away on read."""
+        series = make_series("float", capacity=1, storage_dtype="int16", range={"min": 0.0, "max": 100.0})
+        series.append(0, 50.123)
+
+        _, values = series.window()
+        assert abs(values[0] - 50.123) <= 100.0 / 65535 / 2 + 1e-9
@@ -2,6 +2,7 @@
 Test WebSocket functionality including connections, message handling, and historical data.
 """
 import pytest
+import asyncio
 import json
 from datetime import datetime
 from unittest.mock import AsyncMock, patch
@@ -20,8 +21,8 @@ class TestWebSocketManager:
     
     def test_websocket_manager_initialization(self):
         """Test that WebSocket manager initializes correctly."""
-        assert websocket_manager.active_connections == []
-        assert websocket_manager.message_history == []
+        assert websocket_manager.active_connections == set()
+        assert len(websocket_manager.message_history) == 0
         assert websocket_manager.max_history_size > 0
     
     @pytest.mark.asyncio
@@ -58,16 +59,169 @@ class TestWebSocketManager:
             timestamp=datetime.now()
         ))
         
-        # Broadcast message
+        # Broadcast message and let the writer tasks drain their queues
         await websocket_manager.broadcast_message(test_message)
+        await asyncio.sleep(0.01)
         
-        # Verify both clients received the message
-        mock_ws1.send_text.assert_called_once()
-        mock_ws2.send_text.assert_called_once()
+        # Verify both clients received the same pre-encoded payload
+        mock_ws1.send_bytes.assert_called_once()
+        mock_ws2.send_bytes.assert_called_once()
+        assert mock_ws1.send_bytes.call_args[0][0] == mock_ws2.send_bytes.call_args[0][0]
         
         # Verify message was added to history
         assert len(websocket_manager.message_history) == 1
     
+    @pytest.mark.asyncio
+    async def test_broadcast_batches_queued_messages(self):
+        """Test that messages queued while a client is busy are sent together as a JSON array."""
+        mock_websocket = AsyncMock(spec=WebSocket)
+        await websocket_manager.connect(mock_websocket)
+        
+        # Broadcast without yielding, so all three are queued before the writer wakes up
+        for i in range(3):
+            await websocket_manager.broadcast_message(GenericMessage(TelemetryMessage(
+                id=f"sensor{i}",
+                value=i,
+                timestamp=datetime.now()
+            )))
+        await asyncio.sleep(0.01)
+        
+        mock_websocket.send_bytes.assert_called_once()
+        frame = json.loads(mock_websocket.send_bytes.call_args[0][0])
+        assert [msg["id"] for msg in frame] == ["sensor0", "sensor1", "sensor2"]
+    
+    @pytest.mark.asyncio
+    async def test_broadcast_messages_sends_one_frame(self):
+        """Test that a batch of messages reaches each client as one frame and is stored individually."""
+        mock_websockets = [AsyncMock(spec=WebSocket), AsyncMock(spec=WebSocket)]
+        for mock_websocket in mock_websockets:
+            await websocket_manager.connect(mock_websocket)
+        
+        await websocket_manager.broadcast_messages([
+            GenericMessage(TelemetryMessage(id=f"sensor{i}", value=i, timestamp=datetime.now()))
+            for i in range(3)
+        ])
+        await asyncio.sleep(0.01)
+        
+        for mock_websocket in mock_websockets:
+            mock_websocket.send_bytes.assert_called_once()
+            frame = json.loads(mock_websocket.send_bytes.call_args[0][0])
+            assert [msg["id"] for msg in frame] == ["sensor0", "sensor1", "sensor2"]
+        assert len(websocket_manager.message_history) == 3
+    
+    @pytest.mark.asyncio
+    async def test_writer_lingers_during_bursts(self):
+        """Test that after a batched frame the writer waits for the rest of a burst before sending."""
+        original_linger = websocket_manager.batch_linger
+        websocket_manager.batch_linger = 0.05
+        try:
+            mock_websocket = AsyncMock(spec=WebSocket)
+            await websocket_manager.connect(mock_websocket)
+
+            await websocket_manager.broadcast_messages([
+                GenericMessage(TelemetryMessage(id=f"sensor{i}", value=i, timestamp=datetime.now()))
+                for i in range(2)
+            ])
+            await asyncio.sleep(0.01)
+
+            # Let the writer wake up between the two messages
+            await websocket_manager.broadcast(b'"first"')
+            await asyncio.sleep(0)
+            await websocket_manager.broadcast(b'"second"')
+            await asyncio.sleep(0.1)
+
+            assert mock_websocket.send_bytes.call_count == 2
+            assert json.loads(mock_websocket.send_bytes.call_args[0][0]) == ["first", "second"]
+        finally:
+            websocket_manager.batch_linger = original_linger
+
+    @pytest.mark.asyncio
+    async def test_full_queue_drops_oldest_message(self):
+        """Test that a client whose queue is full loses its oldest messages, not the newest."""
+        original_size = websocket_manager.client_queue_size
+        websocket_manager.client_queue_size = 2
+        try:
+            mock_websocket = AsyncMock(spec=WebSocket)
+            await websocket_manager.connect(mock_websocket)
+            
+            for i in range(4):
+                await websocket_manager.broadcast(f'"message{i}"'.encode())
+            await asyncio.sleep(0.01)
+            
+            frame = json.loads(mock_websocket.send_bytes.call_args[0][0])
+            assert frame == ["message2", "message3"]
+        finally:
+            websocket_manager.client_queue_size = original_size
+    
+    @pytest.mark.asyncio
+    async def test_failed_send_disconnects_only_that_client(self):
+        """Test that a client whose send fails is disconnected without affecting others."""
+        broken_ws = AsyncMock(spec=WebSocket)
+        broken_ws.send_bytes.side_effect = RuntimeError("connection lost")
+        healthy_ws = AsyncMock(spec=WebSocket)
+        await websocket_manager.connect(broken_ws)
+        await websocket_manager.connect(healthy_ws)
+        
+        await websocket_manager.broadcast_message(GenericMessage(TelemetryMessage(
+            id="sensor", value=1, timestamp=datetime.now()
+        )))
+        await asyncio.sleep(0.01)
+        
+        assert broken_ws not in websocket_manager.active_connections
+        broken_ws.close.assert_awaited_once()
+        assert healthy_ws in websocket_manager.active_connections
+        healthy_ws.send_bytes.assert_called_once()
+        healthy_ws.close.assert_not_called()
+    
+    @pytest.mark.asyncio
+    async def test_stalled_send_disconnects_client(self):
+        """Test that a client whose send exceeds the send timeout is disconnected."""
+        async def stalled_send(payload):
+            await asyncio.sleep(10)
+        
+        stalled_ws = AsyncMock(spec=WebSocket)
+        stalled_ws.send_bytes.side_effect = stalled_send
+        await websocket_manager.connect(stalled_ws)
+        
+        original_timeout = websocket_manager.send_timeout
+        websocket_manager.send_timeout = 0.05
+        try:
+            await websocket_manager.broadcast_message(GenericMessage(TelemetryMessage(
+                id="sensor", value=1, timestamp=datetime.now()
+            )))
+            await asyncio.sleep(0.2)
+            
+            assert stalled_ws not in websocket_manager.active_connections
+            stalled_ws.close.assert_awaited_once()
+            
+            # Nothing else is written to the dropped socket
+            await websocket_manager.send_personal_message("{}", stalled_ws)
+            stalled_ws.send_text.assert_not_called()
+        finally:
+            websocket_manager.send_timeout = original_timeout
+    
+    @pytest.mark.asyncio
+    async def test_bad_message_flood_is_rate_limited(self, caplog):
+        """Test that a burst of bad frames is answered frame by frame but only logged up to the rate."""
+        import importlib
+        import logging
+        from services.ratelimited_log import RateLimitedLogger
+        # The services package re-exports the manager instance under the module's name
+        websocket_manager_module = importlib.import_module("services.websocket_manager")
+
+        mock_websocket = AsyncMock(spec=WebSocket)
+        await websocket_manager.connect(mock_websocket)
+
+        limited = RateLimitedLogger(websocket_manager_module.logger, rate=3, per=60.0)
+        with patch.object(websocket_manager_module, "message_logger", limited), \
+                caplog.at_level(logging.ERROR, logger=websocket_manager_module.logger.name):
+            for _ in range(10):
+                with pytest.raises(Exception):
+                    await websocket_manager.handle_incoming_message(mock_websocket, "invalid json")
+
+        assert len([record for record in caplog.records if "Invalid JSON" in record.getMessage()]) == 3
+        assert mock_websocket.send_text.call_count == 10
+
     @pytest.mark.asyncio
     async def test_handle_invalid_command(self):
         """Test handling of invalid command messages."""
@@ -83,6 +237,25 @@ class TestWebSocketManager:
         sent_message = json.loads(mock_websocket.send_text.call_args[0][0])
         assert "error" in sent_message
     
+    @pytest.mark.asyncio
+    async def test_handle_unsupported_message_type(self):
+        """Test that valid messages without an incoming handler are rejected."""
+        mock_websocket = AsyncMock(spec=WebSocket)
+        await websocket_manager.connect(mock_websocket)
+        
+        telemetry_data = {
+            "type": "data",
+            "id": "temperature",
+            "value": 21.0,
+            "timestamp": datetime.now().isoformat()
+        }
+        
+        with pytest.raises(ValueError):
+            await websocket_manager.handle_incoming_message(mock_websocket, json.dumps(telemetry_data))
+        
+        sent_message = json.loads(mock_websocket.send_text.call_args[0][0])
+        assert "Unsupported message type" in sent_message["error"]
+    
     @pytest.mark.asyncio
     async def test_handle_valid_command(self):
         """Test handling of valid command messages."""
@@ -118,6 +291,27 @@ class TestWebSocketManager:
         assert result.command == "test_command"
         assert result.parameters == {"param1": 123}
     
+    @pytest.mark.asyncio
+    async def test_handle_command_without_type(self):
+        """Test that messages without a type are handled as commands."""
+        config_manager.command_templates["test_command"] = CommandTemplate(
+            command="test_command",
+            description="A test command",
+            parameters={}
+        )
+        
+        mock_websocket = AsyncMock(spec=WebSocket)
+        await websocket_manager.connect(mock_websocket)
+        
+        result = await websocket_manager.handle_incoming_message(
+            mock_websocket, 
+            json.dumps({"command": "test_command", "parameters": {}})
+        )
+        
+        assert isinstance(result, CommandMessage)
+        assert result.type == "command"
+        assert result.command == "test_command"
+    
     @pytest.mark.asyncio
     async def test_handle_command_validation_failure(self):
         """Test handling of commands that fail validation."""
@@ -255,6 +449,26 @@ class TestWebSocketManager:
         assert result.total_records == 5
 
 
+    def test_get_historical_data_json_matches_model(self):
+        """Test that the pre-encoded historical data matches the model response."""
+        for i in range(4):
+            websocket_manager.message_history.append(GenericMessage(TelemetryMessage(
+                id=f"sensor{i % 2}",
+                value=i,
+                timestamp=datetime.now()
+            )))
+        
+        from models.configuration import HistoricalDataQuery
+        query = HistoricalDataQuery(id="sensor1", limit=1)
+        
+        encoded = json.loads(websocket_manager.get_historical_data_json(query))
+        expected = websocket_manager.get_historical_data(query).model_dump(mode="json")
+        
+        assert encoded == expected
+        assert encoded["filtered_records"] == 1
+        assert encoded["total_records"] == 4
+
+
 class TestWebSocketEndpoint:
     """Test the WebSocket endpoint integration."""
     
@@ -265,3 +479,66 @@ class TestWebSocketEndpoint:
         with client.websocket_connect("/ws") as websocket:
             # If we get here without exception, the endpoint exists and accepts connections
             assert websocket is not None
+
+
+class TestHistoricalDataEndpoint:
+    """Test the GET /historical-data endpoint."""
+    
+    def test_since_until_query_parameters(self, client):
+        """Test that since/until are parsed into the query time window."""
+        from datetime import timedelta
+        now = datetime.now()
+        for i in range(3):
+            websocket_manager.message_history.append(GenericMessage(TelemetryMessage(
+                id=f"sensor{i}",
+                value=i,
+                timestamp=now + timedelta(minutes=i)
+            )))
+        
+        response = client.get("/historical-data", params={
+            "since": now.isoformat(),
+            "until": (now + timedelta(minutes=2)).isoformat()
+        })
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert [msg["id"] for msg in data["data"]] == ["sensor1"]
+        assert data["total_records"] == 3
+    
+    def test_invalid_timestamp_rejected(self, client):
+        """Test that malformed timestamps are rejected by validation."""
+        response = client.get("/historical-data", params={"since": "not-a-timestamp"})
+        
+        assert response.status_code == 422
+    
+    def test_non_positive_limit_rejected(self, client):
+        """Test that limits below 1 are rejected by validation, also on filtered queries."""
+        for params in ({"limit": 0}, {"type": "data", "limit": -1}, {"id": "sensor", "limit": -2}):
+            assert client.get("/historical-data", params=params).status_code == 422
+        assert client.get("/historical-data/series", params={"id": "sensor", "limit": -1}).status_code == 422
+    
+    def test_numeric_series(self, client):
+        """Test that numeric telemetry is served as timestamp and value columns."""
+        from datetime import timedelta
+        websocket_manager.register_numeric_series({
+            "sensor": TelemetryTypeConfig(data_type="float", description="Test sensor")
+        })
+        now = datetime.now()
+        for i in range(3):
+            websocket_manager._add_to_history(GenericMessage(TelemetryMessage(
+                id="sensor",
+                value=i * 0.5,
+                timestamp=now + timedelta(seconds=i)
+            )))
+        
+        response = client.get("/historical-data/series", params={"id": "sensor", "limit": 2})
+        
+        data = response.json()
+        assert data["id"] == "sensor"
+        assert data["values"] == [0.5, 1.0]
+        assert data["timestamps"][1] - data["timestamps"][0] == 1000
+        
+        response = client.get("/historical-data/series", params={"id": "missing"})
+        assert "error" in response.json()
+        
+        websocket_manager.register_numeric_series({})
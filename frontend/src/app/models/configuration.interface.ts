@@ -14,6 +14,7 @@ export interface TelemetryTypeConfig {
     range?: Record<string, number>; // For numeric types, e.g., { min: 0, max: 100 }, keys can be different based on the device
     description: string;
     enum?: (string | number)[];  // For types with fixed values (e.g., "on", "off"; or 1, 2, 3)
+    storage_dtype?: 'float32' | 'int16'; // Reduced precision storage of the backend history, int16 needs range min/max
 }
 
 /**
@@ -157,6 +157,29 @@ describe('ConnectionService', () => {
             expect(bufferedMessages[0]).toEqual(telemetryMessage);
         });
 
+        it('should unpack batched frames into individual messages', () => {
+            const tempMessage: TelemetryMessage = {
+                type: 'data',
+                id: 'temperature',
+                value: 23.5,
+                timestamp: '2025-08-02T10:00:00.000Z'
+            };
+
+            const pressureMessage: TelemetryMessage = {
+                type: 'data',
+                id: 'pressure',
+                value: 1013.25,
+                timestamp: '2025-08-02T10:00:00.000Z'
+            };
+
+            mockMessages$.next(JSON.stringify([tempMessage, pressureMessage]));
+
+            const bufferedMessages = service.getBufferedMessages();
+            expect(bufferedMessages.length).toBe(2);
+            expect(bufferedMessages[0]).toEqual(tempMessage);
+            expect(bufferedMessages[1]).toEqual(pressureMessage);
+        });
+
         it('should filter telemetry messages by sensor ID', () => {
             const tempMessage: TelemetryMessage = {
                 type: 'data',
@@ -6,7 +6,7 @@
 
 import { Injectable, OnDestroy } from '@angular/core';
 import { HttpClient } from '@angular/common/http';
-import { filter, map, Observable, Subject, catchError, EMPTY, merge, take, BehaviorSubject, Subscription } from 'rxjs';
+import { filter, map, mergeMap, Observable, Subject, catchError, EMPTY, merge, take, BehaviorSubject, Subscription } from 'rxjs';
 import { environment } from '../../environments/environment';
 import {
     TelemetryMessage,
@@ -78,7 +78,9 @@ export class ConnectionService implements OnDestroy {
 
         this.messages$ = this.websocketService.getMessages().pipe(
             filter((message: string) => message !== null && message !== undefined),
-            map((message: string) => JSON.parse(message) as GenericMessage),
+            map((message: string) => JSON.parse(message) as GenericMessage | GenericMessage[]),
+            // Messages queued together on the backend arrive as a single JSON array
+            mergeMap((parsed: GenericMessage | GenericMessage[]) => Array.isArray(parsed) ? parsed : [parsed]),
             catchError(validationError)
         );
 
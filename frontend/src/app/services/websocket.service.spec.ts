@@ -12,6 +12,7 @@ class MockWebSocket {
     static CLOSED = 3;
 
     readyState: number = MockWebSocket.CONNECTING;
+    binaryType: BinaryType = 'blob';
     url: string;
     onopen: ((event: Event) => void) | null = null;
     onclose: ((event: CloseEvent) => void) | null = null;
@@ -273,6 +274,27 @@ describe('WebSocketService', () => {
             mockWebSocket.simulateMessage(testMessage);
         });
 
+        it('should decode binary frames to strings', (done) => {
+            const testMessage = {
+                type: 'data',
+                id: 'temperature',
+                value: 23.5,
+                timestamp: new Date().toISOString()
+            };
+            const encoded = new TextEncoder().encode(JSON.stringify(testMessage));
+
+            service.getMessages().subscribe(message => {
+                expect(message).toEqual(JSON.stringify(testMessage));
+                done();
+            });
+
+            if (mockWebSocket.onmessage) {
+                mockWebSocket.onmessage(new MessageEvent('message', {
+                    data: encoded.buffer
+                }));
+            }
+        });
+
         it('should pass through malformed messages without parsing', (done) => {
             const malformedData = 'invalid json {';
             
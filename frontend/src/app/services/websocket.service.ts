@@ -31,6 +31,7 @@ export class WebSocketService {
     private errors$ = new Subject<ConnectionError>();
     private destroy$ = new Subject<void>();
     private connectionTimeout: any;
+    private textDecoder = new TextDecoder();
 
     constructor(private ngZone: NgZone) {
         console.log('WebSocketService initialized with config:', this.config);
@@ -126,6 +127,8 @@ export class WebSocketService {
 
         try {
             this.socket = new WebSocket(this.config.url);
+            // The backend sends JSON as binary frames; receive them as ArrayBuffers so they can be decoded synchronously
+            this.socket.binaryType = 'arraybuffer';
             this.setUpEventHandlers();
 
             this.connectionTimeout = setTimeout(() => {
@@ -297,9 +300,10 @@ export class WebSocketService {
 
         this.socket.onmessage = (event) => {
             // Just pass the raw data string - let the calling service handle parsing and validation
-            console.log('Received raw message:', event.data);
+            const data: string = typeof event.data === 'string' ? event.data : this.textDecoder.decode(event.data);
+            console.log('Received raw message:', data);
             this.ngZone.run(() => {
-                this.messages$.next(event.data);
+                this.messages$.next(data);
             });
         };
 